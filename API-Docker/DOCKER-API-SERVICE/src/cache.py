@@ -0,0 +1,195 @@
+import cachetools
+from cachetools.keys import hashkey
+from functools import wraps
+import threading
+import weakref
+
+# How long a cache miss waits for an identical in-flight call before
+# running the call itself (e.g. when the first caller streams to a slow client
+# or its Docker call hangs)
+INFLIGHT_WAIT = 10.0
+
+# Per-manager in-flight state (see _Flight)
+_flights = weakref.WeakKeyDictionary()
+_flights_lock = threading.Lock()
+
+# `docker system df` walks every container and volume filesystem on the
+# daemon, so its result is shared by all managers and kept for 30 seconds
+DF_CACHE_TTL = 30.0
+_df_cache = cachetools.TTLCache(maxsize=4, ttl=DF_CACHE_TTL)
+_df_condition = threading.Condition()
+
+def cached_method(name: str):
+    """
+    Cache a manager method's result in the manager's TTL cache.
+    
+    The manager must define `_cache` (a cachetools cache) and `_cache_lock`,
+    and invalidate the cache with clear_cache(). Entries are keyed by the
+    method name and call arguments so several methods can share one cache
+    and be invalidated together. Concurrent misses for the same key are
+    coalesced: the first caller runs the method and the others wait for
+    its result (up to INFLIGHT_WAIT seconds, then they run it themselves).
+    A result computed while the cache was cleared is returned to its
+    caller only; waiting callers then run the method again.
+    
+    Args:
+        name (str): Key prefix identifying the cached method
+        
+    Returns:
+        Callable: Method decorator
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = hashkey(name, *args, **kwargs)
+            flight = _flight(self)
+            condition = flight.condition
+            with condition:
+                # After a timeout the key stays claimed by the stuck call,
+                # so this call runs without claiming it
+                claimed = condition.wait_for(lambda: key not in flight.pending, timeout=INFLIGHT_WAIT)
+                try:
+                    return self._cache[key]
+                except KeyError:
+                    pass
+                if claimed:
+                    flight.pending.add(key)
+                generation = flight.generation
+            try:
+                value = method(self, *args, **kwargs)
+                with condition:
+                    if flight.generation == generation:
+                        self._cache[key] = value
+                return value
+            finally:
+                if claimed:
+                    with condition:
+                        flight.pending.discard(key)
+                        condition.notify_all()
+        return wrapper
+    return decorator
+
+def cached_iterator(name: str):
+    """
+    Cache the items produced by a manager generator method.
+    
+    While a fresh entry exists the items are replayed from it; otherwise the
+    generator runs and its items are stored once it has been fully consumed,
+    so callers can stream items as they are produced and later calls still
+    hit the cache. A caller that misses while the same generator is already
+    running waits for it (up to INFLIGHT_WAIT seconds) and replays its items.
+    Uses the same `_cache`/`_cache_lock` as cached_method.
+    
+    Args:
+        name (str): Key prefix identifying the cached method
+        
+    Returns:
+        Callable: Method decorator
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = hashkey(name, *args, **kwargs)
+            with self._cache_lock:
+                items = self._cache.get(key)
+            if items is not None:
+                return iter(items)
+            return _collect(self, key, lambda: method(self, *args, **kwargs))
+        return wrapper
+    return decorator
+
+def clear_cache(manager):
+    """
+    Clear a manager's cache and discard results still being computed.
+    
+    Any call or generator running while the cache is cleared may have read
+    the state from before the change, so its result is not stored.
+    
+    Args:
+        manager: Manager defining `_cache` and `_cache_lock`
+    """
+    flight = _flight(manager)
+    with flight.condition:
+        manager._cache.clear()
+        flight.generation += 1
+
+class _Flight:
+    """In-flight state of one manager's cache."""
+    
+    __slots__ = ('condition', 'pending', 'generation')
+    
+    def __init__(self, lock):
+        # Condition over the manager's cache lock, signalled when a key is released
+        self.condition = threading.Condition(lock)
+        # Keys currently being computed
+        self.pending = set()
+        # Bumped on every invalidation; a result is only stored if it is
+        # unchanged since the computation started
+        self.generation = 0
+
+def _flight(manager):
+    """Get the in-flight state of a manager, creating it on first use."""
+    with _flights_lock:
+        flight = _flights.get(manager)
+        if flight is None:
+            flight = _flights[manager] = _Flight(manager._cache_lock)
+        return flight
+
+def _collect(manager, key, start):
+    """Yield the items for key, from an in-flight or new run, and cache them once exhausted."""
+    flight = _flight(manager)
+    condition = flight.condition
+    # Claimed on first iteration, so a generator that is never started
+    # cannot leave the key claimed
+    with condition:
+        condition.wait_for(lambda: key not in flight.pending, timeout=INFLIGHT_WAIT)
+        items = manager._cache.get(key)
+        if items is None:
+            flight.pending.add(key)
+            generation = flight.generation
+    if items is not None:
+        yield from items
+        return
+    
+    try:
+        items = []
+        for item in start():
+            items.append(item)
+            yield item
+        with condition:
+            if flight.generation == generation:
+                manager._cache[key] = items
+    finally:
+        with condition:
+            flight.pending.discard(key)
+            condition.notify_all()
+
+def cached_df(client, refresh: bool = False):
+    """
+    Get the daemon's disk usage (`client.df()`), shared across managers.
+    
+    Concurrent callers wait for a single in-flight df instead of each
+    starting their own filesystem walk on the daemon.
+    
+    Args:
+        client (docker.DockerClient): Docker client to query
+        refresh (bool): Bypass the cached result and query the daemon again
+        
+    Returns:
+        Dict: Raw `docker system df` data
+    """
+    if refresh:
+        with _df_condition:
+            _df_cache.pop(hashkey(client), None)
+    return _df(client)
+
+def invalidate_df():
+    """Drop the cached disk usage after containers, images or volumes change."""
+    with _df_condition:
+        _df_cache.clear()
+
+@cachetools.cached(_df_cache, condition=_df_condition)
+def _df(client):
+    """Query the daemon's disk usage through the shared cache."""
+    return client.df()
+
@@ -1,6 +1,24 @@
+import cachetools
+from concurrent.futures import ThreadPoolExecutor
 import docker
-from typing import Dict, List, Any, Optional
-import logging
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Any, Optional
+import re
+import threading
+
+from src.cache import cached_method, clear_cache, invalidate_df
+from src.docker_client import get_client
+from src.errors import DockerOpError
+
+# Docker error messages that map to friendlier errors
+_ALREADY_STARTED = re.compile(r'already started', re.IGNORECASE)
+_ALREADY_STOPPED = re.compile(r'already stopped', re.IGNORECASE)
+_CANNOT_REMOVE_RUNNING = re.compile(r'cannot remove running container', re.IGNORECASE)
+_ALREADY_IN_USE = re.compile(r'already in use', re.IGNORECASE)
+
+# Shortest ID prefix a cached handle is reused for (the short ID length);
+# anything shorter may just as well be a container name
+_MIN_HANDLE_PREFIX = 12
 
 class ContainerManager:
     """
@@ -8,16 +26,32 @@ class ContainerManager:
     restarting, removing containers, and getting container logs and details.
     """
     
-    def __init__(self):
-        """Initialize Docker client connection."""
-        try:
-            self.client = docker.from_env()
-            # Test connection
-            self.client.ping()
-        except Exception as e:
-            logging.error(f"Failed to connect to Docker daemon: {e}")
-            raise ConnectionError("Cannot connect to Docker daemon. Make sure Docker is running.")
+    def __init__(self, client: Optional[docker.DockerClient] = None,
+                 image_index: Optional[Callable[[], Dict[str, List[str]]]] = None):
+        """
+        Initialize the manager.
+        
+        Args:
+            client (docker.DockerClient, optional): Docker client to use (defaults to the shared client)
+            image_index (callable, optional): Returns an image ID to tags map, e.g.
+                ImageManager.get_image_index (defaults to querying /images/json directly)
+        """
+        self.client = client or get_client()
+        self._image_index = image_index or self._get_image_tags
+        # Short-lived cache for read operations polled by dashboards
+        self._cache = cachetools.TTLCache(maxsize=128, ttl=1.5)
+        self._cache_lock = threading.RLock()
+        # Container handles by full ID, reused by back-to-back operations on
+        # the same container so each start/stop/restart/remove skips an inspect
+        # call; names are always resolved by the daemon, since they can move
+        # to another container at any time
+        self._handles = cachetools.TTLCache(maxsize=256, ttl=30)
+        self._handles_lock = threading.Lock()
+        # Fan-out pool for batched lookups, kept apart from the background job
+        # pool so queued pulls and builds never delay a batch
+        self._lookup_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='container-lookup')
     
+    @cached_method('list_containers')
     def list_containers(self, all_containers: bool = False) -> List[Dict[str, Any]]:
         """
         List all containers (running by default, or all if specified).
@@ -29,26 +63,27 @@ class ContainerManager:
             List[Dict]: List of container information dictionaries
         """
         try:
-            containers = self.client.containers.list(all=all_containers)
-            container_list = []
+            # One /containers/json call plus one /images/json call, instead of
+            # an inspect and an image lookup per container
+            containers = self.client.api.containers(all=all_containers)
+            image_tags = self._image_index()
             
-            for container in containers:
-                container_info = {
-                    'id': container.id[:12],  # Short ID
-                    'name': container.name,
-                    'image': container.image.tags[0] if container.image.tags else container.image.id[:12],
-                    'status': container.status,
-                    'created': container.attrs['Created'],
-                    'ports': container.attrs.get('NetworkSettings', {}).get('Ports', {}),
-                    'labels': container.labels
+            return [
+                {
+                    'id': container['Id'][:12],  # Short ID
+                    'name': (container.get('Names') or ['/'])[0].lstrip('/'),
+                    'image': (image_tags.get(container.get('ImageID', '')) or [container.get('ImageID', '')[:12]])[0],
+                    'status': container.get('State', 'unknown'),
+                    'created': self._format_timestamp(container.get('Created', 0)),
+                    'ports': self._format_ports(container.get('Ports') or []),
+                    'labels': container.get('Labels') or {}
                 }
-                container_list.append(container_info)
-            
-            return container_list
+                for container in containers
+            ]
         except Exception as e:
-            logging.error(f"Error listing containers: {e}")
-            raise Exception(f"Failed to list containers: {str(e)}")
+            raise DockerOpError(f"Failed to list containers: {str(e)}") from e
     
+    @cached_method('get_container_details')
     def get_container_details(self, container_id: str) -> Dict[str, Any]:
         """
         Get detailed information about a specific container.
@@ -61,32 +96,69 @@ class ContainerManager:
         """
         try:
             container = self.client.containers.get(container_id)
+            attrs = container.attrs
+            state = attrs['State']
+            config = attrs['Config']
+            network_settings = attrs.get('NetworkSettings', {})
             
             details = {
                 'id': container.id,
                 'name': container.name,
                 'image': container.image.tags[0] if container.image.tags else container.image.id[:12],
                 'status': container.status,
-                'created': container.attrs['Created'],
-                'started': container.attrs['State'].get('StartedAt'),
-                'finished': container.attrs['State'].get('FinishedAt'),
-                'exit_code': container.attrs['State'].get('ExitCode'),
-                'ports': container.attrs.get('NetworkSettings', {}).get('Ports', {}),
-                'networks': list(container.attrs.get('NetworkSettings', {}).get('Networks', {}).keys()),
-                'mounts': [mount['Source'] + ':' + mount['Destination'] for mount in container.attrs.get('Mounts', [])],
-                'environment': container.attrs['Config'].get('Env', []),
+                'created': attrs['Created'],
+                'started': state.get('StartedAt'),
+                'finished': state.get('FinishedAt'),
+                'exit_code': state.get('ExitCode'),
+                'ports': network_settings.get('Ports', {}),
+                'networks': list(network_settings.get('Networks', {}).keys()),
+                'mounts': [mount['Source'] + ':' + mount['Destination'] for mount in attrs.get('Mounts', [])],
+                'environment': config.get('Env', []),
                 'labels': container.labels,
-                'command': container.attrs['Config'].get('Cmd'),
-                'working_dir': container.attrs['Config'].get('WorkingDir'),
-                'restart_policy': container.attrs['HostConfig'].get('RestartPolicy', {})
+                'command': config.get('Cmd'),
+                'working_dir': config.get('WorkingDir'),
+                'restart_policy': attrs['HostConfig'].get('RestartPolicy', {})
             }
             
             return details
         except docker.errors.NotFound:
-            raise Exception(f"Container '{container_id}' not found")
+            raise DockerOpError(f"Container '{container_id}' not found")
         except Exception as e:
-            logging.error(f"Error getting container details: {e}")
-            raise Exception(f"Failed to get container details: {str(e)}")
+            raise DockerOpError(f"Failed to get container details: {str(e)}") from e
+    
+    def get_containers_details(self, container_ids: List[str]) -> Dict[str, Any]:
+        """
+        Get detailed information about several containers at once.
+        
+        The lookups run concurrently on the shared client. A container that
+        cannot be inspected is reported under 'errors' instead of failing the
+        whole batch.
+        
+        Args:
+            container_ids (list): Container IDs or names
+            
+        Returns:
+            Dict: 'containers' mapping each ID to its details and 'errors'
+            mapping each failed ID to its error message
+        """
+        def lookup(container_id: str):
+            try:
+                return container_id, self.get_container_details(container_id), None
+            except Exception as e:
+                return container_id, None, str(e)
+        
+        containers = {}
+        errors = {}
+        for container_id, details, error in self._lookup_executor.map(lookup, dict.fromkeys(container_ids)):
+            if error is None:
+                containers[container_id] = details
+            else:
+                errors[container_id] = error
+        
+        return {
+            'containers': containers,
+            'errors': errors
+        }
     
     def start_container(self, container_id: str) -> Dict[str, str]:
         """
@@ -99,8 +171,9 @@ class ContainerManager:
             Dict: Success message with container info
         """
         try:
-            container = self.client.containers.get(container_id)
+            container = self._get_container(container_id)
             container.start()
+            self.invalidate_cache()
             
             return {
                 'message': f"Container '{container.name}' started successfully",
@@ -109,14 +182,14 @@ class ContainerManager:
                 'status': 'started'
             }
         except docker.errors.NotFound:
-            raise Exception(f"Container '{container_id}' not found")
+            self._forget_container(container_id)
+            raise DockerOpError(f"Container '{container_id}' not found")
         except docker.errors.APIError as e:
-            if 'already started' in str(e).lower():
-                raise Exception(f"Container '{container_id}' is already running")
-            raise Exception(f"Failed to start container: {str(e)}")
+            if _ALREADY_STARTED.search(str(e)):
+                raise DockerOpError(f"Container '{container_id}' is already running") from e
+            raise DockerOpError(f"Failed to start container: {str(e)}") from e
         except Exception as e:
-            logging.error(f"Error starting container: {e}")
-            raise Exception(f"Failed to start container: {str(e)}")
+            raise DockerOpError(f"Failed to start container: {str(e)}") from e
     
     def stop_container(self, container_id: str, timeout: int = 10) -> Dict[str, str]:
         """
@@ -130,8 +203,9 @@ class ContainerManager:
             Dict: Success message with container info
         """
         try:
-            container = self.client.containers.get(container_id)
+            container = self._get_container(container_id)
             container.stop(timeout=timeout)
+            self.invalidate_cache()
             
             return {
                 'message': f"Container '{container.name}' stopped successfully",
@@ -140,14 +214,14 @@ class ContainerManager:
                 'status': 'stopped'
             }
         except docker.errors.NotFound:
-            raise Exception(f"Container '{container_id}' not found")
+            self._forget_container(container_id)
+            raise DockerOpError(f"Container '{container_id}' not found")
         except docker.errors.APIError as e:
-            if 'already stopped' in str(e).lower():
-                raise Exception(f"Container '{container_id}' is already stopped")
-            raise Exception(f"Failed to stop container: {str(e)}")
+            if _ALREADY_STOPPED.search(str(e)):
+                raise DockerOpError(f"Container '{container_id}' is already stopped") from e
+            raise DockerOpError(f"Failed to stop container: {str(e)}") from e
         except Exception as e:
-            logging.error(f"Error stopping container: {e}")
-            raise Exception(f"Failed to stop container: {str(e)}")
+            raise DockerOpError(f"Failed to stop container: {str(e)}") from e
     
     def restart_container(self, container_id: str, timeout: int = 10) -> Dict[str, str]:
         """
@@ -161,8 +235,9 @@ class ContainerManager:
             Dict: Success message with container info
         """
         try:
-            container = self.client.containers.get(container_id)
+            container = self._get_container(container_id)
             container.restart(timeout=timeout)
+            self.invalidate_cache()
             
             return {
                 'message': f"Container '{container.name}' restarted successfully",
@@ -171,10 +246,10 @@ class ContainerManager:
                 'status': 'restarted'
             }
         except docker.errors.NotFound:
-            raise Exception(f"Container '{container_id}' not found")
+            self._forget_container(container_id)
+            raise DockerOpError(f"Container '{container_id}' not found")
         except Exception as e:
-            logging.error(f"Error restarting container: {e}")
-            raise Exception(f"Failed to restart container: {str(e)}")
+            raise DockerOpError(f"Failed to restart container: {str(e)}") from e
     
     def remove_container(self, container_id: str, force: bool = False) -> Dict[str, str]:
         """
@@ -188,9 +263,11 @@ class ContainerManager:
             Dict: Success message with container info
         """
         try:
-            container = self.client.containers.get(container_id)
+            container = self._get_container(container_id)
             container_name = container.name
             container.remove(force=force)
+            self._forget_container(container.id)
+            self.invalidate_cache()
             
             return {
                 'message': f"Container '{container_name}' removed successfully",
@@ -199,14 +276,14 @@ class ContainerManager:
                 'status': 'removed'
             }
         except docker.errors.NotFound:
-            raise Exception(f"Container '{container_id}' not found")
+            self._forget_container(container_id)
+            raise DockerOpError(f"Container '{container_id}' not found")
         except docker.errors.APIError as e:
-            if 'cannot remove running container' in str(e).lower():
-                raise Exception(f"Cannot remove running container '{container_id}'. Stop it first or use force=True")
-            raise Exception(f"Failed to remove container: {str(e)}")
+            if _CANNOT_REMOVE_RUNNING.search(str(e)):
+                raise DockerOpError(f"Cannot remove running container '{container_id}'. Stop it first or use force=True") from e
+            raise DockerOpError(f"Failed to remove container: {str(e)}") from e
         except Exception as e:
-            logging.error(f"Error removing container: {e}")
-            raise Exception(f"Failed to remove container: {str(e)}")
+            raise DockerOpError(f"Failed to remove container: {str(e)}") from e
     
     def get_container_logs(self, container_id: str, tail: int = 100, follow: bool = False) -> Dict[str, Any]:
         """
@@ -232,10 +309,33 @@ class ContainerManager:
                 'timestamp': container.attrs['State'].get('StartedAt')
             }
         except docker.errors.NotFound:
-            raise Exception(f"Container '{container_id}' not found")
+            raise DockerOpError(f"Container '{container_id}' not found")
+        except Exception as e:
+            raise DockerOpError(f"Failed to get container logs: {str(e)}") from e
+    
+    def stream_container_logs(self, container_id: str, tail: int = 100, follow: bool = False) -> Iterator[bytes]:
+        """
+        Stream logs from a container chunk by chunk instead of buffering them.
+        
+        The container is looked up before the stream is returned, so a missing
+        container is reported as an error rather than as an empty stream.
+        
+        Args:
+            container_id (str): Container ID or name
+            tail (int): Number of lines to show from the end of logs
+            follow (bool): Keep the stream open and follow new log output
+            
+        Returns:
+            Iterator[bytes]: Raw log chunks as read from the Docker daemon
+        """
+        try:
+            container = self._get_container(container_id)
+            return container.logs(tail=tail, stream=True, follow=follow)
+        except docker.errors.NotFound:
+            self._forget_container(container_id)
+            raise DockerOpError(f"Container '{container_id}' not found")
         except Exception as e:
-            logging.error(f"Error getting container logs: {e}")
-            raise Exception(f"Failed to get container logs: {str(e)}")
+            raise DockerOpError(f"Failed to stream container logs: {str(e)}") from e
     
     def create_container(self, image: str, name: Optional[str] = None, **kwargs) -> Dict[str, str]:
         """
@@ -251,6 +351,7 @@ class ContainerManager:
         """
         try:
             container = self.client.containers.create(image, name=name, **kwargs)
+            self.invalidate_cache()
             
             return {
                 'message': f"Container created successfully",
@@ -260,12 +361,95 @@ class ContainerManager:
                 'status': 'created'
             }
         except docker.errors.ImageNotFound:
-            raise Exception(f"Image '{image}' not found")
+            raise DockerOpError(f"Image '{image}' not found")
         except docker.errors.APIError as e:
-            if 'already in use' in str(e).lower():
-                raise Exception(f"Container name '{name}' is already in use")
-            raise Exception(f"Failed to create container: {str(e)}")
+            if _ALREADY_IN_USE.search(str(e)):
+                raise DockerOpError(f"Container name '{name}' is already in use") from e
+            raise DockerOpError(f"Failed to create container: {str(e)}") from e
         except Exception as e:
-            logging.error(f"Error creating container: {e}")
-            raise Exception(f"Failed to create container: {str(e)}")
+            raise DockerOpError(f"Failed to create container: {str(e)}") from e
+
+    def invalidate_cache(self):
+        """Drop cached container listings and details after a state change."""
+        clear_cache(self)
+        # Disk usage changes with them
+        invalidate_df()
+    
+    def _get_container(self, container_id: str):
+        """
+        Get a container handle, reusing a recently looked-up one.
+        
+        A cached handle is only reused when `container_id` is a full or short
+        ID (a prefix of at least 12 characters) of exactly one cached handle;
+        names are always looked up, so a name now belonging to another
+        container never resolves to the old one. Only the handle's ID and name
+        are relied on, which do not go stale when the container changes state;
+        reads that need current attributes go through containers.get directly.
+        
+        Args:
+            container_id (str): Container ID or name
+            
+        Returns:
+            Container: Docker container object
+        """
+        container = None
+        if len(container_id) >= _MIN_HANDLE_PREFIX:
+            with self._handles_lock:
+                container = self._handles.get(container_id)
+                if container is None:
+                    matches = [handle for full_id, handle in self._handles.items() if full_id.startswith(container_id)]
+                    if len(matches) == 1:
+                        container = matches[0]
+        if container is None:
+            container = self.client.containers.get(container_id)
+            with self._handles_lock:
+                self._handles[container.id] = container
+        return container
+    
+    def _forget_container(self, container_id: str):
+        """Drop the cached handles a container ID refers to once the container is gone."""
+        if len(container_id) < _MIN_HANDLE_PREFIX:
+            # A name, or a prefix too short to have been served from the cache
+            return
+        with self._handles_lock:
+            for full_id in [full_id for full_id in self._handles if full_id.startswith(container_id)]:
+                del self._handles[full_id]
+    
+    def _get_image_tags(self) -> Dict[str, List[str]]:
+        """
+        Map image IDs to their repository tags with a single /images/json call.
+        
+        Returns:
+            Dict: Image ID to list of tags (untagged images map to an empty list)
+        """
+        return {
+            image['Id']: [tag for tag in (image.get('RepoTags') or []) if tag != '<none>:<none>']
+            for image in self.client.api.images()
+        }
+    
+    def _format_ports(self, ports: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Convert the port list from /containers/json into the inspect-style
+        mapping, e.g. {'80/tcp': [{'HostIp': '0.0.0.0', 'HostPort': '8080'}]}.
+        
+        Args:
+            ports (list): Port entries from the container list payload
+            
+        Returns:
+            Dict: Ports keyed by '<port>/<protocol>'
+        """
+        formatted_ports = {}
+        for port in ports:
+            key = f"{port.get('PrivatePort')}/{port.get('Type', 'tcp')}"
+            if 'PublicPort' in port:
+                bindings = formatted_ports.get(key) or []
+                bindings.append({'HostIp': port.get('IP', ''), 'HostPort': str(port['PublicPort'])})
+                formatted_ports[key] = bindings
+            else:
+                formatted_ports.setdefault(key, None)
+        return formatted_ports
+    
+    def _format_timestamp(self, timestamp: int) -> str:
+        """Format a Unix timestamp from the container list payload as an ISO 8601 UTC string."""
+        return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
 
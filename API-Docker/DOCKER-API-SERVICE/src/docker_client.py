@@ -0,0 +1,91 @@
+from concurrent.futures import ThreadPoolExecutor
+import docker
+from docker.utils import kwargs_from_env
+from typing import Optional
+import logging
+import orjson
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Keep-alive connections kept open to the daemon. Under the gevent worker
+# each in-flight request (up to --worker-connections, 1000 in the Dockerfile)
+# makes its Docker calls on a connection of its own. The pool does not block:
+# calls beyond this many still run, on extra connections that are closed
+# once the call returns, so this only needs to cover the usual concurrency
+# rather than the worker's limit
+DOCKER_MAX_POOL_SIZE = int(os.environ.get('DOCKER_MAX_POOL_SIZE', 100))
+
+# Keep-alive connections opened at start-up, so the first concurrent
+# requests do not each pay connection (and, for tcp:// daemons, TLS) setup
+DOCKER_WARM_CONNECTIONS = 8
+
+_client: Optional[docker.DockerClient] = None
+_client_lock = threading.Lock()
+
+class _APIClient(docker.APIClient):
+    """Low-level client that parses JSON responses with orjson."""
+    
+    def _result(self, response, json=False, binary=False):
+        # Listings, inspects and above all `docker system df` can be
+        # megabytes of JSON; orjson parses them a few times faster than the
+        # standard library decoder used by requests
+        if json:
+            self._raise_for_status(response)
+            return orjson.loads(response.content)
+        return super()._result(response, json=json, binary=binary)
+
+class _DockerClient(docker.DockerClient):
+    """Docker client whose `api` is an _APIClient (DockerClient only ever builds its APIClient here)."""
+    
+    def __init__(self, *args, **kwargs):
+        self.api = _APIClient(*args, **kwargs)
+
+def get_client() -> docker.DockerClient:
+    """
+    Get the Docker client shared by all managers.
+
+    The client is created and pinged once on first use; every later call
+    returns the same instance so all managers reuse its keep-alive
+    connections to the Docker daemon.
+
+    Returns:
+        docker.DockerClient: Shared Docker client
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                try:
+                    client = _DockerClient(
+                        max_pool_size=DOCKER_MAX_POOL_SIZE,
+                        **kwargs_from_env()
+                    )
+                    # Test connection
+                    client.ping()
+                except Exception as e:
+                    logger.error("Failed to connect to Docker daemon: %s", e)
+                    raise ConnectionError("Cannot connect to Docker daemon. Make sure Docker is running.")
+                _warm_pool(client, DOCKER_WARM_CONNECTIONS)
+                _client = client
+    return _client
+
+def _warm_pool(client: docker.DockerClient, connections: int):
+    """
+    Open keep-alive connections ahead of the first requests.
+    
+    The pings run concurrently, so each one holds a connection of its own
+    and returns it to the pool afterwards; sequential pings would all
+    reuse a single connection. Failures are only logged, since the
+    daemon has already answered the first ping.
+    
+    Args:
+        client (docker.DockerClient): Client whose pool to fill
+        connections (int): Number of connections to open
+    """
+    try:
+        with ThreadPoolExecutor(max_workers=connections, thread_name_prefix='docker-warmup') as executor:
+            list(executor.map(lambda _: client.ping(), range(connections)))
+    except Exception as e:
+        logger.warning("Failed to pre-open Docker connections: %s", e)
@@ -0,0 +1,9 @@
+class DockerOpError(Exception):
+    """
+    A Docker operation performed by one of the managers failed.
+    
+    The message is meant for API clients (e.g. "Volume 'data' not found");
+    the underlying Docker error, if any, is chained as __cause__. Managers
+    raise it without logging: the Flask error handler and the job runner
+    log each failure once, where it is reported.
+    """
@@ -0,0 +1,24 @@
+from functools import lru_cache
+
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+@lru_cache(maxsize=4096)
+def format_size(size_bytes: int) -> str:
+    """
+    Format size in bytes to human readable format.
+    
+    Results are cached, since the same sizes (0, shared layers, the host's
+    memory and disk totals) come up again on every listing and stats request.
+    
+    Args:
+        size_bytes (int): Size in bytes
+        
+    Returns:
+        str: Size with one decimal and a binary unit (e.g. '1.5 MB')
+    """
+    if size_bytes == 0:
+        return "0 B"
+    # Each unit is 2**10 times the previous one, so the unit index is
+    # the number of whole 10-bit groups in the size
+    exponent = min(max((int(size_bytes).bit_length() - 1) // 10, 0), len(_SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << (exponent * 10)):.1f} {_SIZE_UNITS[exponent]}"
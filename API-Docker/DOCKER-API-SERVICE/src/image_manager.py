@@ -1,6 +1,18 @@
+import cachetools
+from collections import deque
+from datetime import datetime
 import docker
-from typing import Dict, List, Any, Optional
-import logging
+from typing import BinaryIO, Dict, Iterator, List, Any, Optional
+import re
+import threading
+
+from src.cache import cached_iterator, cached_method, clear_cache, invalidate_df
+from src.docker_client import get_client
+from src.errors import DockerOpError
+from src.formatting import format_size
+
+# Docker error messages that map to friendlier errors
+_IMAGE_IN_USE = re.compile(r'image is being used', re.IGNORECASE)
 
 class ImageManager:
     """
@@ -8,15 +20,17 @@ class ImageManager:
     building images, and getting image details and size information.
     """
     
-    def __init__(self):
-        """Initialize Docker client connection."""
-        try:
-            self.client = docker.from_env()
-            # Test connection
-            self.client.ping()
-        except Exception as e:
-            logging.error(f"Failed to connect to Docker daemon: {e}")
-            raise ConnectionError("Cannot connect to Docker daemon. Make sure Docker is running.")
+    def __init__(self, client: Optional[docker.DockerClient] = None):
+        """
+        Initialize the manager.
+        
+        Args:
+            client (docker.DockerClient, optional): Docker client to use (defaults to the shared client)
+        """
+        self.client = client or get_client()
+        # Short-lived cache for read operations polled by dashboards
+        self._cache = cachetools.TTLCache(maxsize=128, ttl=1.5)
+        self._cache_lock = threading.RLock()
     
     def list_images(self, all_images: bool = False) -> List[Dict[str, Any]]:
         """
@@ -28,107 +42,140 @@ class ImageManager:
         Returns:
             List[Dict]: List of image information dictionaries
         """
-        try:
-            images = self.client.images.list(all=all_images)
-            image_list = []
-            
-            for image in images:
-                # Handle images without tags (dangling images)
-                tags = image.tags if image.tags else ['<none>:<none>']
-                
-                image_info = {
-                    'id': image.id.split(':')[1][:12],  # Short ID
-                    'tags': tags,
-                    'repository': tags[0].split(':')[0] if ':' in tags[0] else tags[0],
-                    'tag': tags[0].split(':')[1] if ':' in tags[0] else 'latest',
-                    'created': image.attrs['Created'],
-                    'size': self._format_size(image.attrs['Size']),
-                    'size_bytes': image.attrs['Size'],
-                    'virtual_size': self._format_size(image.attrs.get('VirtualSize', image.attrs['Size'])),
-                    'labels': image.attrs['Config'].get('Labels') or {},
-                    'architecture': image.attrs.get('Architecture', 'unknown'),
-                    'os': image.attrs.get('Os', 'unknown')
-                }
-                image_list.append(image_info)
+        return list(self.iter_images(all_images))
+    
+    @cached_iterator('list_images')
+    def iter_images(self, all_images: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Yield image information one image at a time, for streaming responses.
+        
+        Args:
+            all_images (bool): If True, list all images including intermediate ones
             
-            return image_list
+        Returns:
+            Iterator[Dict]: Image information dictionaries
+        """
+        try:
+            # Inspect each image from the shared /images/json summaries so a
+            # refresh that also lists containers does not list images twice;
+            # images removed since the summaries were fetched are skipped
+            for summary in self._get_image_summaries(all_images):
+                image = self._inspect_image(summary['Id'])
+                if image is not None:
+                    yield self._format_image_summary(image)
+        except Exception as e:
+            raise DockerOpError(f"Failed to list images: {str(e)}") from e
+    
+    @cached_method('get_image_index')
+    def get_image_index(self) -> Dict[str, List[str]]:
+        """
+        Map image IDs to their repository tags.
+        
+        Shared with ContainerManager to resolve container image names, and
+        built from the same cached /images/json call as list_images.
+        
+        Returns:
+            Dict: Image ID to list of tags (untagged images map to an empty list)
+        """
+        try:
+            return {
+                image['Id']: [tag for tag in (image.get('RepoTags') or []) if tag != '<none>:<none>']
+                for image in self._get_image_summaries(False)
+            }
         except Exception as e:
-            logging.error(f"Error listing images: {e}")
-            raise Exception(f"Failed to list images: {str(e)}")
+            raise DockerOpError(f"Failed to build image index: {str(e)}") from e
     
-    def get_image_details(self, image_id: str) -> Dict[str, Any]:
+    @cached_method('get_image_details')
+    def get_image_details(self, image_id: str, include_history: bool = False) -> Dict[str, Any]:
         """
         Get detailed information about a specific image.
         
         Args:
             image_id (str): Image ID, name, or tag
+            include_history (bool): Also fetch the layer history (one extra Docker API call)
             
         Returns:
             Dict: Detailed image information
         """
         try:
             image = self.client.images.get(image_id)
+            attrs = image.attrs
+            config = attrs['Config']
+            size_bytes = attrs['Size']
             
             details = {
                 'id': image.id,
                 'tags': image.tags,
-                'created': image.attrs['Created'],
-                'size': self._format_size(image.attrs['Size']),
-                'size_bytes': image.attrs['Size'],
-                'virtual_size': self._format_size(image.attrs.get('VirtualSize', image.attrs['Size'])),
-                'architecture': image.attrs.get('Architecture', 'unknown'),
-                'os': image.attrs.get('Os', 'unknown'),
-                'docker_version': image.attrs.get('DockerVersion'),
-                'author': image.attrs.get('Author', ''),
+                'created': attrs['Created'],
+                'created_epoch': self._parse_timestamp(attrs['Created']),
+                'size': format_size(size_bytes),
+                'size_bytes': size_bytes,
+                'virtual_size': format_size(attrs.get('VirtualSize', size_bytes)),
+                'architecture': attrs.get('Architecture', 'unknown'),
+                'os': attrs.get('Os', 'unknown'),
+                'docker_version': attrs.get('DockerVersion'),
+                'author': attrs.get('Author', ''),
                 'config': {
-                    'cmd': image.attrs['Config'].get('Cmd'),
-                    'entrypoint': image.attrs['Config'].get('Entrypoint'),
-                    'env': image.attrs['Config'].get('Env', []),
-                    'exposed_ports': list(image.attrs['Config'].get('ExposedPorts', {}).keys()),
-                    'labels': image.attrs['Config'].get('Labels') or {},
-                    'user': image.attrs['Config'].get('User', ''),
-                    'working_dir': image.attrs['Config'].get('WorkingDir', ''),
-                    'volumes': list(image.attrs['Config'].get('Volumes', {}).keys())
-                },
-                'history': self._get_image_history(image_id)
+                    'cmd': config.get('Cmd'),
+                    'entrypoint': config.get('Entrypoint'),
+                    'env': config.get('Env', []),
+                    'exposed_ports': list(config.get('ExposedPorts', {}).keys()),
+                    'labels': config.get('Labels') or {},
+                    'user': config.get('User', ''),
+                    'working_dir': config.get('WorkingDir', ''),
+                    'volumes': list(config.get('Volumes', {}).keys())
+                }
             }
             
+            if include_history:
+                details['history'] = self._get_image_history(image_id)
+            
             return details
         except docker.errors.ImageNotFound:
-            raise Exception(f"Image '{image_id}' not found")
+            raise DockerOpError(f"Image '{image_id}' not found")
         except Exception as e:
-            logging.error(f"Error getting image details: {e}")
-            raise Exception(f"Failed to get image details: {str(e)}")
+            raise DockerOpError(f"Failed to get image details: {str(e)}") from e
     
-    def pull_image(self, image_name: str, tag: str = 'latest') -> Dict[str, Any]:
+    def pull_image(self, image_name: str, tag: str = 'latest', mirror: Optional[str] = None) -> Dict[str, Any]:
         """
         Pull an image from a registry.
         
         Args:
             image_name (str): Image name (e.g., 'nginx', 'ubuntu')
             tag (str): Image tag (default: 'latest')
+            mirror (str, optional): Registry mirror to pull official images through;
+                the pulled image is tagged with its original name as well
             
         Returns:
             Dict: Pull operation result
         """
+        full_image_name = f"{image_name}:{tag}"
+        # Official images ('nginx', not 'user/app' or 'registry/app') are
+        # stored under 'library/' on the mirror
+        pull_name = image_name
+        if mirror and '/' not in image_name:
+            pull_name = f"{mirror.rstrip('/')}/library/{image_name}"
         try:
-            full_image_name = f"{image_name}:{tag}"
-            image = self.client.images.pull(image_name, tag=tag)
+            image = self.client.images.pull(pull_name, tag=tag)
+            if pull_name != image_name:
+                # Make the image usable under the name that was asked for
+                image.tag(image_name, tag=tag)
+                image.reload()
+            self.invalidate_cache()
             
             return {
                 'message': f"Image '{full_image_name}' pulled successfully",
                 'image_id': image.id.split(':')[1][:12],
                 'tags': image.tags,
-                'size': self._format_size(image.attrs['Size']),
+                'size': format_size(image.attrs['Size']),
                 'status': 'pulled'
             }
         except docker.errors.ImageNotFound:
-            raise Exception(f"Image '{image_name}:{tag}' not found in registry")
+            raise DockerOpError(f"Image '{pull_name}:{tag}' not found in registry")
         except docker.errors.APIError as e:
-            raise Exception(f"Failed to pull image: {str(e)}")
+            raise DockerOpError(f"Failed to pull image: {str(e)}") from e
         except Exception as e:
-            logging.error(f"Error pulling image: {e}")
-            raise Exception(f"Failed to pull image: {str(e)}")
+            raise DockerOpError(f"Failed to pull image: {str(e)}") from e
     
     def remove_image(self, image_id: str, force: bool = False, no_prune: bool = False) -> Dict[str, str]:
         """
@@ -147,6 +194,7 @@ class ImageManager:
             image_tags = image.tags.copy() if image.tags else ['<none>:<none>']
             
             self.client.images.remove(image_id, force=force, noprune=no_prune)
+            self.invalidate_cache()
             
             return {
                 'message': f"Image removed successfully",
@@ -155,14 +203,13 @@ class ImageManager:
                 'status': 'removed'
             }
         except docker.errors.ImageNotFound:
-            raise Exception(f"Image '{image_id}' not found")
+            raise DockerOpError(f"Image '{image_id}' not found")
         except docker.errors.APIError as e:
-            if 'image is being used' in str(e).lower():
-                raise Exception(f"Cannot remove image '{image_id}' - it's being used by containers. Use force=True or stop containers first")
-            raise Exception(f"Failed to remove image: {str(e)}")
+            if _IMAGE_IN_USE.search(str(e)):
+                raise DockerOpError(f"Cannot remove image '{image_id}' - it's being used by containers. Use force=True or stop containers first") from e
+            raise DockerOpError(f"Failed to remove image: {str(e)}") from e
         except Exception as e:
-            logging.error(f"Error removing image: {e}")
-            raise Exception(f"Failed to remove image: {str(e)}")
+            raise DockerOpError(f"Failed to remove image: {str(e)}") from e
     
     def build_image(self, path: str, tag: Optional[str] = None, dockerfile: str = 'Dockerfile', **kwargs) -> Dict[str, Any]:
         """
@@ -177,16 +224,37 @@ class ImageManager:
         Returns:
             Dict: Build operation result
         """
+        return self._build(path=path, tag=tag, dockerfile=dockerfile, **kwargs)
+    
+    def build_image_from_archive(self, fileobj: BinaryIO, tag: Optional[str] = None, dockerfile: str = 'Dockerfile', **kwargs) -> Dict[str, Any]:
+        """
+        Build an image from an uploaded tar archive of the build context.
+        
+        The archive is streamed to the Docker daemon as-is and closed once
+        the build finishes.
+        
+        Args:
+            fileobj (file): Tar archive of the build context
+            tag (str, optional): Tag for the built image
+            dockerfile (str): Path of the Dockerfile inside the archive (default: 'Dockerfile')
+            **kwargs: Additional build parameters
+            
+        Returns:
+            Dict: Build operation result
+        """
+        try:
+            return self._build(fileobj=fileobj, custom_context=True, tag=tag, dockerfile=dockerfile, **kwargs)
+        finally:
+            fileobj.close()
+    
+    def _build(self, **build_kwargs) -> Dict[str, Any]:
+        """Run a build with the given docker-py build arguments and summarize the result."""
         try:
-            image, build_logs = self.client.images.build(
-                path=path,
-                tag=tag,
-                dockerfile=dockerfile,
-                **kwargs
-            )
+            image, build_logs = self.client.images.build(**build_kwargs)
+            self.invalidate_cache()
             
-            # Extract build logs
-            logs = []
+            # Extract build logs, keeping only the last 10 lines in memory
+            logs = deque(maxlen=10)
             for log in build_logs:
                 if 'stream' in log:
                     logs.append(log['stream'].strip())
@@ -195,17 +263,16 @@ class ImageManager:
                 'message': f"Image built successfully",
                 'image_id': image.id.split(':')[1][:12],
                 'tags': image.tags,
-                'size': self._format_size(image.attrs['Size']),
-                'build_logs': logs[-10:],  # Last 10 log lines
+                'size': format_size(image.attrs['Size']),
+                'build_logs': list(logs),  # Last 10 log lines
                 'status': 'built'
             }
         except docker.errors.BuildError as e:
-            raise Exception(f"Build failed: {str(e)}")
+            raise DockerOpError(f"Build failed: {str(e)}") from e
         except docker.errors.APIError as e:
-            raise Exception(f"Failed to build image: {str(e)}")
+            raise DockerOpError(f"Failed to build image: {str(e)}") from e
         except Exception as e:
-            logging.error(f"Error building image: {e}")
-            raise Exception(f"Failed to build image: {str(e)}")
+            raise DockerOpError(f"Failed to build image: {str(e)}") from e
     
     def search_images(self, term: str, limit: int = 25) -> List[Dict[str, Any]]:
         """
@@ -234,8 +301,7 @@ class ImageManager:
             
             return search_results
         except Exception as e:
-            logging.error(f"Error searching images: {e}")
-            raise Exception(f"Failed to search images: {str(e)}")
+            raise DockerOpError(f"Failed to search images: {str(e)}") from e
     
     def prune_images(self, dangling_only: bool = True) -> Dict[str, Any]:
         """
@@ -250,24 +316,76 @@ class ImageManager:
         try:
             filters = {'dangling': True} if dangling_only else {}
             result = self.client.images.prune(filters=filters)
+            self.invalidate_cache()
             
             return {
                 'message': 'Image pruning completed',
                 'images_deleted': result.get('ImagesDeleted', []),
-                'space_reclaimed': self._format_size(result.get('SpaceReclaimed', 0)),
+                'space_reclaimed': format_size(result.get('SpaceReclaimed', 0)),
                 'space_reclaimed_bytes': result.get('SpaceReclaimed', 0)
             }
         except Exception as e:
-            logging.error(f"Error pruning images: {e}")
-            raise Exception(f"Failed to prune images: {str(e)}")
+            raise DockerOpError(f"Failed to prune images: {str(e)}") from e
     
-    def _format_size(self, size_bytes: int) -> str:
-        """Format size in bytes to human readable format."""
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.1f} PB"
+    def _format_image_summary(self, image) -> Dict[str, Any]:
+        """
+        Build the list entry for an image.
+        
+        Args:
+            image: Docker image object
+            
+        Returns:
+            Dict: Image summary information
+        """
+        # Handle images without tags (dangling images)
+        tags = image.tags if image.tags else ['<none>:<none>']
+        repository, sep, tag = tags[0].rpartition(':')
+        if not sep:
+            repository, tag = tags[0], 'latest'
+        
+        size_bytes = image.attrs['Size']
+        size = format_size(size_bytes)
+        virtual_size_bytes = image.attrs.get('VirtualSize', size_bytes)
+        
+        return {
+            'id': image.id.split(':')[1][:12],  # Short ID
+            'tags': tags,
+            'repository': repository,
+            'tag': tag,
+            'created': image.attrs['Created'],
+            'created_epoch': self._parse_timestamp(image.attrs['Created']),
+            'size': size,
+            'size_bytes': size_bytes,
+            'virtual_size': size if virtual_size_bytes == size_bytes else format_size(virtual_size_bytes),
+            'labels': image.attrs['Config'].get('Labels') or {},
+            'architecture': image.attrs.get('Architecture', 'unknown'),
+            'os': image.attrs.get('Os', 'unknown')
+        }
+    
+    @cached_method('_get_image_summaries')
+    def _get_image_summaries(self, all_images: bool = False) -> List[Dict[str, Any]]:
+        """Get the raw /images/json summaries."""
+        return self.client.api.images(all=all_images)
+    
+    def _inspect_image(self, image_id: str) -> Optional[docker.models.images.Image]:
+        """Inspect one image, or return None if it was removed after being listed."""
+        try:
+            return self.client.images.get(image_id)
+        except docker.errors.NotFound:
+            return None
+    
+    def invalidate_cache(self):
+        """Drop cached image listings and details after a change."""
+        clear_cache(self)
+        # Disk usage changes with them
+        invalidate_df()
+    
+    def _parse_timestamp(self, timestamp: str) -> Optional[int]:
+        """Convert an RFC 3339 timestamp from Docker to Unix seconds (None if it cannot be parsed)."""
+        try:
+            return int(datetime.fromisoformat(timestamp).timestamp())
+        except (TypeError, ValueError):
+            return None
     
     def _get_image_history(self, image_id: str) -> List[Dict[str, Any]]:
         """Get image layer history."""
@@ -280,7 +398,7 @@ class ImageManager:
                     'id': layer.get('Id', '<missing>')[:12],
                     'created': layer.get('Created'),
                     'created_by': layer.get('CreatedBy', '')[:100] + '...' if len(layer.get('CreatedBy', '')) > 100 else layer.get('CreatedBy', ''),
-                    'size': self._format_size(layer.get('Size', 0))
+                    'size': format_size(layer.get('Size', 0))
                 }
                 formatted_history.append(layer_info)
             
@@ -0,0 +1,85 @@
+import cachetools
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+import logging
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Shared pool for long-running Docker operations, so request threads return
+# immediately instead of being held for the length of a pull or build
+EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix='docker-job')
+
+# Jobs still pending or running; they move to _finished when they complete
+_running: Dict[str, Dict[str, Any]] = {}
+# Finished jobs are kept for an hour after completion so clients have time
+# to poll the result
+_finished = cachetools.TTLCache(maxsize=1024, ttl=3600)
+_jobs_lock = threading.Lock()
+
+def submit_job(operation: str, func: Callable[..., Any], *args, **kwargs) -> str:
+    """
+    Run a Docker operation in the background.
+    
+    Args:
+        operation (str): Operation name reported back when polling (e.g. 'pull_image')
+        func (callable): Manager method to run
+        *args, **kwargs: Arguments passed to the manager method
+        
+    Returns:
+        str: Job ID to poll with get_job
+    """
+    job_id = uuid.uuid4().hex
+    future = EXECUTOR.submit(func, *args, **kwargs)
+    with _jobs_lock:
+        _running[job_id] = {
+            'operation': operation,
+            'submitted': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'future': future
+        }
+    # Registered once the job is recorded, since it runs right away if the
+    # job has already finished
+    future.add_done_callback(lambda f: _finish_job(job_id, operation, f))
+    return job_id
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the status of a background job.
+    
+    Args:
+        job_id (str): Job ID returned by submit_job
+        
+    Returns:
+        Dict: Job status, with 'result' once completed or 'error' if it failed,
+        or None if the job is unknown or has expired
+    """
+    with _jobs_lock:
+        job = _running.get(job_id) or _finished.get(job_id)
+    if job is None:
+        return None
+    
+    future: Future = job['future']
+    status = {
+        'job_id': job_id,
+        'operation': job['operation'],
+        'submitted': job['submitted'],
+        'status': 'running' if not future.done() else 'completed'
+    }
+    if future.done():
+        error = future.exception()
+        if error is not None:
+            status['status'] = 'failed'
+            status['error'] = str(error)
+        else:
+            status['result'] = future.result()
+    return status
+
+def _finish_job(job_id: str, operation: str, future: Future):
+    """Move a job to the finished jobs when it completes, logging it if it failed."""
+    with _jobs_lock:
+        _finished[job_id] = _running.pop(job_id)
+    error = future.exception()
+    if error is not None:
+        logger.error("Error in job %s (%s): %s", job_id, operation, error)
@@ -0,0 +1,119 @@
+from flask import Response, current_app, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+from typing import Any, Iterable, Union
+import logging
+import orjson
+
+logger = logging.getLogger(__name__)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that serializes and parses with orjson.
+    
+    orjson encodes the large container and image listings several times
+    faster than the standard library, and parses request bodies faster
+    too. Output matches the default provider: keys are sorted only if
+    `sort_keys` is enabled (the app disables it, keeping insertion order),
+    non-string keys are converted, and types orjson does not know fall
+    back to Flask's default serializer.
+    """
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """
+        Serialize data as JSON to a string.
+        
+        Args:
+            obj: The data to serialize
+            **kwargs: 'sort_keys', 'default' and 'indent' are honoured; output is otherwise compact
+            
+        Returns:
+            str: JSON document
+        """
+        return self.dumps_bytes(obj, **kwargs).decode('utf-8')
+    
+    def dumps_bytes(self, obj: Any, **kwargs: Any) -> bytes:
+        """
+        Serialize data as JSON to UTF-8 bytes, as produced natively by orjson.
+        
+        Args:
+            obj: The data to serialize
+            **kwargs: Same as dumps
+            
+        Returns:
+            bytes: JSON document
+        """
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=kwargs.get('default', self.default), option=option)
+    
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        """
+        Deserialize data as JSON from a string or bytes.
+        
+        Args:
+            s: Text or UTF-8 bytes
+            **kwargs: Ignored, orjson takes no parsing options
+            
+        Returns:
+            The parsed data
+        """
+        return orjson.loads(s)
+    
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        """
+        Serialize the given arguments as JSON and return a response (used by jsonify).
+        
+        The orjson bytes are used as the body directly instead of being
+        decoded to a string and encoded again by the response.
+        
+        Returns:
+            Response: application/json response
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumps_bytes(obj, indent=indent) + b'\n', mimetype=self.mimetype)
+
+def json_array_stream(key: str, items: Iterable[Any]) -> Response:
+    """
+    Stream {key: [...], 'count': n, 'success': true} one item at a time.
+    
+    The body has the same fields as the jsonify responses of the list
+    endpoints, but the client starts receiving items while later ones are
+    still being fetched and the full document is never built in memory.
+    The first item is fetched before the response starts, so an error
+    there (e.g. Docker being unreachable) still reaches the error handler.
+    An error after that point closes the document with 'error' and
+    'success': false instead of truncating it.
+    
+    Args:
+        key (str): Name of the array field (e.g. 'images')
+        items (iterable): Items to serialize
+        
+    Returns:
+        Response: Streaming application/json response
+    """
+    dumps = current_app.json.dumps_bytes
+    iterator = iter(items)
+    first = next(iterator, None)
+    
+    def generate():
+        yield b'{' + dumps(key) + b':['
+        if first is None:
+            yield b'],"count":0,"success":true}\n'
+            return
+        yield dumps(first)
+        count = 1
+        try:
+            for item in iterator:
+                yield b',' + dumps(item)
+                count += 1
+        except Exception as e:
+            logger.error("Error streaming %s: %s", key, e)
+            yield b'],"count":' + dumps(count) + b',"error":' + dumps(str(e)) + b',"success":false}\n'
+            return
+        yield b'],"count":' + dumps(count) + b',"success":true}\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/json')
@@ -3,16 +3,27 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, jsonify, request, send_from_directory, stream_with_context
 from flask_cors import CORS
+from functools import lru_cache, wraps
+from werkzeug.exceptions import HTTPException
+import cachetools
+import hashlib
 import logging
+import msgpack
+import shutil
+import tempfile
+import threading
 
 # Import all manager classes
+from src.docker_client import get_client
 from src.container_manager import ContainerManager
 from src.image_manager import ImageManager
 from src.volume_manager import VolumeManager
 from src.network_manager import NetworkManager
 from src.system_manager import SystemManager
+from src.jobs import get_job, submit_job
+from src.json_provider import OrjsonProvider, json_array_stream
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,35 +31,185 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'docker-management-api-secret-key'
+# Serialize jsonify() responses with orjson, compact and in insertion order
+# even when debug mode is on
+app.json = OrjsonProvider(app)
+app.json.compact = True
+app.json.sort_keys = False
+
+# Upper bound on the number of containers in one batch request
+MAX_BATCH_SIZE = 100
+
+# Optional registry mirror (e.g. 'mirror.internal') that official Docker Hub
+# images are pulled through instead of Docker Hub itself
+DOCKER_MIRROR = os.environ.get('DOCKER_MIRROR')
+
+# Build requests: JSON bodies above MAX_BUILD_JSON_BODY are rejected before
+# being parsed, and uploaded build contexts are kept in memory up to
+# MAX_BUILD_BODY bytes and spooled to a temporary file beyond that
+MAX_BUILD_JSON_BODY = 1024 * 1024
+MAX_BUILD_BODY = 8 * 1024 * 1024
 
 # Enable CORS for all routes
 CORS(app)
 
-# Initialize manager instances
+# Initialize manager instances sharing a single Docker client
 try:
-    container_mgr = ContainerManager()
-    image_mgr = ImageManager()
-    volume_mgr = VolumeManager()
-    network_mgr = NetworkManager()
-    system_mgr = SystemManager()
+    docker_client = get_client()
+    image_mgr = ImageManager(docker_client)
+    container_mgr = ContainerManager(docker_client, image_index=image_mgr.get_image_index)
+    volume_mgr = VolumeManager(docker_client)
+    network_mgr = NetworkManager(docker_client)
+    system_mgr = SystemManager(docker_client)
     logger.info("All Docker managers initialized successfully")
 except Exception as e:
-    logger.error(f"Failed to initialize Docker managers: {e}")
+    logger.error("Failed to initialize Docker managers: %s", e)
     container_mgr = image_mgr = volume_mgr = network_mgr = system_mgr = None
 
-def handle_error(func):
-    """Decorator to handle errors and return JSON responses."""
-    def wrapper(*args, **kwargs):
-        try:
-            return func(*args, **kwargs)
-        except Exception as e:
-            logger.error(f"Error in {func.__name__}: {e}")
-            return jsonify({
-                'error': str(e),
-                'success': False
-            }), 500
-    wrapper.__name__ = func.__name__
-    return wrapper
+@app.errorhandler(Exception)
+def handle_error(e):
+    """Turn errors raised by any endpoint into JSON responses."""
+    if isinstance(e, HTTPException):
+        # Keep the status of HTTP errors (400, 405, 415, ...) and let
+        # routing redirects through untouched
+        if e.code is None or e.code < 400:
+            return e
+        return jsonify({
+            'error': e.description,
+            'success': False
+        }), e.code
+    # The one place endpoint failures are logged; arguments are only
+    # formatted if the record is emitted
+    logger.error("Error in %s: %s", request.endpoint, e)
+    return jsonify({
+        'error': str(e),
+        'success': False
+    }), 500
+
+def _error_body(message: str) -> bytes:
+    """Serialize a constant error payload, so it is encoded once at import time."""
+    return app.json.dumps_bytes({'error': message, 'success': False}) + b'\n'
+
+def _bad_request(body: bytes) -> Response:
+    """Return a 400 response with a precomputed error body."""
+    return Response(body, status=400, mimetype='application/json')
+
+# Validation errors with constant messages
+_ERR_INVALID_IDS = _error_body("'ids' must be a list of container IDs or names")
+_ERR_BATCH_TOO_LARGE = _error_body(f"At most {MAX_BATCH_SIZE} containers can be requested at once")
+_ERR_TERM_REQUIRED = _error_body('Search term is required')
+_ERR_INVALID_MIRROR = _error_body("'mirror' must be a registry host name or null")
+_ERR_BUILD_BODY_TOO_LARGE = _error_body(
+    f"Build request bodies are limited to {MAX_BUILD_JSON_BODY} bytes; upload large build contexts as application/x-tar"
+)
+
+# Query string values accepted as true by boolean flags
+_TRUTHY = frozenset({'true', 'True', 'TRUE', '1', 'yes', 'on'})
+
+def _query_bool(name: str, default: bool = False) -> bool:
+    """Read a boolean query parameter with a set lookup instead of lowercasing the value."""
+    value = request.args.get(name)
+    return default if value is None else value in _TRUTHY
+
+def _query_int(name: str, default: int) -> int:
+    """Read an integer query parameter, skipping the conversion when it is absent."""
+    value = request.args.get(name)
+    return default if value is None else int(value)
+
+def json_body(required: str = None, error: str = None):
+    """
+    Decorator that parses the JSON request body once and passes it as `data`.
+    
+    The body is parsed regardless of the Content-Type header; a missing or
+    non-object body becomes an empty dict. When `required` is given and
+    missing from the body, a 400 response with `error` is returned.
+    
+    Args:
+        required (str, optional): Key that must be present in the body
+        error (str, optional): Error message for a missing required key
+        
+    Returns:
+        Callable: Route decorator
+    """
+    if required is not None:
+        error_body = _error_body(error)
+    
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            data = request.get_json(force=True, silent=True)
+            if not isinstance(data, dict):
+                data = {}
+            if required is not None and required not in data:
+                return _bad_request(error_body)
+            return func(*args, data=data, **kwargs)
+        return wrapper
+    return decorator
+
+def cached_etag(ttl: float = None, maxsize: int = 8):
+    """
+    Decorator adding a weak ETag and conditional GET support to a read endpoint.
+    
+    The response body is kept per URL for `ttl` seconds (forever when None),
+    so repeated polls within that window neither call Docker nor serialize
+    again, and clients sending a matching If-None-Match get a bodyless 304.
+    Only 200 responses are cached.
+    
+    Args:
+        ttl (float, optional): Seconds a cached body stays valid
+        maxsize (int): Number of URLs whose bodies are kept
+        
+    Returns:
+        Callable: Route decorator
+    """
+    def decorator(func):
+        cache = cachetools.LRUCache(maxsize=maxsize) if ttl is None else cachetools.TTLCache(maxsize=maxsize, ttl=ttl)
+        lock = threading.Lock()
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with lock:
+                entry = cache.get(request.url)
+            if entry is None:
+                response = func(*args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                body = response.get_data()
+                entry = (hashlib.blake2b(body, digest_size=8).hexdigest(), body, response.mimetype)
+                with lock:
+                    cache[request.url] = entry
+            
+            etag, body, mimetype = entry
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            else:
+                response = Response(body, mimetype=mimetype)
+            response.set_etag(etag, weak=True)
+            return response
+        return wrapper
+    return decorator
+
+def auto_serialize(payload: dict) -> Response:
+    """
+    Serialize a response as MessagePack or JSON, following the Accept header.
+    
+    Programmatic clients sending 'Accept: application/msgpack' get the
+    compact binary encoding of the numeric-heavy statistics payloads;
+    everyone else gets the usual JSON response.
+    
+    Args:
+        payload (dict): Response data
+        
+    Returns:
+        Response: application/msgpack or application/json response
+    """
+    best = request.accept_mimetypes.best_match(['application/json', 'application/msgpack'])
+    if best == 'application/msgpack':
+        response = Response(msgpack.packb(payload, use_bin_type=True), mimetype='application/msgpack')
+    else:
+        response = jsonify(payload)
+    response.vary.add('Accept')
+    return response
 
 # Health check endpoint
 @app.route('/health', methods=['GET'])
@@ -81,10 +242,9 @@ def health_check():
 # ============================================================================
 
 @app.route('/api/containers', methods=['GET'])
-@handle_error
 def list_containers():
     """List all containers."""
-    all_containers = request.args.get('all', 'false').lower() == 'true'
+    all_containers = _query_bool('all')
     containers = container_mgr.list_containers(all_containers=all_containers)
     return jsonify({
         'containers': containers,
@@ -93,7 +253,6 @@ def list_containers():
     })
 
 @app.route('/api/containers/<container_id>', methods=['GET'])
-@handle_error
 def get_container_details(container_id):
     """Get details of a specific container."""
     details = container_mgr.get_container_details(container_id)
@@ -102,8 +261,25 @@ def get_container_details(container_id):
         'success': True
     })
 
+@app.route('/api/containers/batch', methods=['POST'])
+@json_body()
+def get_containers_details(data):
+    """Get details of several containers in one request."""
+    container_ids = data.get('ids')
+    if not isinstance(container_ids, list) or not all(isinstance(c, str) for c in container_ids):
+        return _bad_request(_ERR_INVALID_IDS)
+    if len(container_ids) > MAX_BATCH_SIZE:
+        return _bad_request(_ERR_BATCH_TOO_LARGE)
+    
+    result = container_mgr.get_containers_details(container_ids)
+    return jsonify({
+        'containers': result['containers'],
+        'errors': result['errors'],
+        'count': len(result['containers']),
+        'success': True
+    })
+
 @app.route('/api/containers/<container_id>/start', methods=['POST'])
-@handle_error
 def start_container(container_id):
     """Start a container."""
     result = container_mgr.start_container(container_id)
@@ -113,10 +289,10 @@ def start_container(container_id):
     })
 
 @app.route('/api/containers/<container_id>/stop', methods=['POST'])
-@handle_error
-def stop_container(container_id):
+@json_body()
+def stop_container(container_id, data):
     """Stop a container."""
-    timeout = request.json.get('timeout', 10) if request.json else 10
+    timeout = data.get('timeout', 10)
     result = container_mgr.stop_container(container_id, timeout=timeout)
     return jsonify({
         'result': result,
@@ -124,10 +300,10 @@ def stop_container(container_id):
     })
 
 @app.route('/api/containers/<container_id>/restart', methods=['POST'])
-@handle_error
-def restart_container(container_id):
+@json_body()
+def restart_container(container_id, data):
     """Restart a container."""
-    timeout = request.json.get('timeout', 10) if request.json else 10
+    timeout = data.get('timeout', 10)
     result = container_mgr.restart_container(container_id, timeout=timeout)
     return jsonify({
         'result': result,
@@ -135,10 +311,9 @@ def restart_container(container_id):
     })
 
 @app.route('/api/containers/<container_id>/remove', methods=['DELETE'])
-@handle_error
 def remove_container(container_id):
     """Remove a container."""
-    force = request.args.get('force', 'false').lower() == 'true'
+    force = _query_bool('force')
     result = container_mgr.remove_container(container_id, force=force)
     return jsonify({
         'result': result,
@@ -146,27 +321,27 @@ def remove_container(container_id):
     })
 
 @app.route('/api/containers/<container_id>/logs', methods=['GET'])
-@handle_error
 def get_container_logs(container_id):
     """Get container logs."""
-    tail = int(request.args.get('tail', 100))
+    tail = _query_int('tail', 100)
     logs = container_mgr.get_container_logs(container_id, tail=tail)
     return jsonify({
         'logs': logs,
         'success': True
     })
 
+@app.route('/api/containers/<container_id>/logs/stream', methods=['GET'])
+def stream_container_logs(container_id):
+    """Stream container logs as plain text without buffering them in memory."""
+    tail = _query_int('tail', 100)
+    follow = _query_bool('follow')
+    logs = container_mgr.stream_container_logs(container_id, tail=tail, follow=follow)
+    return Response(stream_with_context(logs), mimetype='text/plain')
+
 @app.route('/api/containers', methods=['POST'])
-@handle_error
-def create_container():
+@json_body('image', 'Image name is required')
+def create_container(data):
     """Create a new container."""
-    data = request.json
-    if not data or 'image' not in data:
-        return jsonify({
-            'error': 'Image name is required',
-            'success': False
-        }), 400
-    
     image = data['image']
     name = data.get('name')
     
@@ -184,53 +359,45 @@ def create_container():
 # ============================================================================
 
 @app.route('/api/images', methods=['GET'])
-@handle_error
 def list_images():
     """List all images."""
-    all_images = request.args.get('all', 'false').lower() == 'true'
-    images = image_mgr.list_images(all_images=all_images)
-    return jsonify({
-        'images': images,
-        'count': len(images),
-        'success': True
-    })
+    all_images = _query_bool('all')
+    return json_array_stream('images', image_mgr.iter_images(all_images))
 
 @app.route('/api/images/<path:image_id>', methods=['GET'])
-@handle_error
 def get_image_details(image_id):
     """Get details of a specific image."""
-    details = image_mgr.get_image_details(image_id)
+    include_history = _query_bool('history')
+    details = image_mgr.get_image_details(image_id, include_history=include_history)
     return jsonify({
         'image': details,
         'success': True
     })
 
 @app.route('/api/images/pull', methods=['POST'])
-@handle_error
-def pull_image():
+@json_body('image', 'Image name is required')
+def pull_image(data):
     """Pull an image from registry."""
-    data = request.json
-    if not data or 'image' not in data:
-        return jsonify({
-            'error': 'Image name is required',
-            'success': False
-        }), 400
-    
     image_name = data['image']
     tag = data.get('tag', 'latest')
+    mirror = data.get('mirror', DOCKER_MIRROR)
+    if mirror is not None and not isinstance(mirror, str):
+        return _bad_request(_ERR_INVALID_MIRROR)
     
-    result = image_mgr.pull_image(image_name, tag=tag)
+    # Pulls can take minutes, so run them in the background and let the
+    # client poll /api/jobs/<job_id> for the result
+    job_id = submit_job('pull_image', image_mgr.pull_image, image_name, tag=tag, mirror=mirror)
     return jsonify({
-        'result': result,
+        'job_id': job_id,
+        'status_url': f"/api/jobs/{job_id}",
         'success': True
-    })
+    }), 202
 
 @app.route('/api/images/<path:image_id>/remove', methods=['DELETE'])
-@handle_error
 def remove_image(image_id):
     """Remove an image."""
-    force = request.args.get('force', 'false').lower() == 'true'
-    no_prune = request.args.get('no_prune', 'false').lower() == 'true'
+    force = _query_bool('force')
+    no_prune = _query_bool('no_prune')
     result = image_mgr.remove_image(image_id, force=force, no_prune=no_prune)
     return jsonify({
         'result': result,
@@ -238,16 +405,43 @@ def remove_image(image_id):
     })
 
 @app.route('/api/images/build', methods=['POST'])
-@handle_error
 def build_image():
-    """Build an image from Dockerfile."""
-    data = request.json
-    if not data or 'path' not in data:
-        return jsonify({
-            'error': 'Build path is required',
-            'success': False
-        }), 400
+    """Build an image from a build path (JSON body) or an uploaded tar build context."""
+    if request.mimetype == 'application/x-tar':
+        return _build_image_from_archive()
+    
+    # Reject oversized JSON before parsing it; bodies sent without a
+    # Content-Length are capped at the same size while being read
+    if request.content_length is not None and request.content_length > MAX_BUILD_JSON_BODY:
+        return Response(_ERR_BUILD_BODY_TOO_LARGE, status=413, mimetype='application/json')
+    request.max_content_length = MAX_BUILD_JSON_BODY
+    return _build_image_from_path()
+
+def _build_image_from_archive():
+    """Start a build from the tar build context in the request body."""
+    tag = request.args.get('tag')
+    dockerfile = request.args.get('dockerfile', 'Dockerfile')
     
+    # The job outlives the request, so copy the upload out of the request
+    # stream in chunks instead of parsing or buffering it whole
+    context = tempfile.SpooledTemporaryFile(max_size=MAX_BUILD_BODY)
+    try:
+        shutil.copyfileobj(request.stream, context)
+        context.seek(0)
+    except Exception:
+        context.close()
+        raise
+    
+    job_id = submit_job('build_image', image_mgr.build_image_from_archive, context, tag=tag, dockerfile=dockerfile)
+    return jsonify({
+        'job_id': job_id,
+        'status_url': f"/api/jobs/{job_id}",
+        'success': True
+    }), 202
+
+@json_body('path', 'Build path is required')
+def _build_image_from_path(data):
+    """Start a build from the build path in the JSON request body."""
     path = data['path']
     tag = data.get('tag')
     dockerfile = data.get('dockerfile', 'Dockerfile')
@@ -255,24 +449,22 @@ def build_image():
     # Remove known parameters and pass the rest as kwargs
     kwargs = {k: v for k, v in data.items() if k not in ['path', 'tag', 'dockerfile']}
     
-    result = image_mgr.build_image(path, tag=tag, dockerfile=dockerfile, **kwargs)
+    job_id = submit_job('build_image', image_mgr.build_image, path, tag=tag, dockerfile=dockerfile, **kwargs)
     return jsonify({
-        'result': result,
+        'job_id': job_id,
+        'status_url': f"/api/jobs/{job_id}",
         'success': True
-    })
+    }), 202
 
 @app.route('/api/images/search', methods=['GET'])
-@handle_error
+@cached_etag(ttl=30.0, maxsize=256)
 def search_images():
     """Search for images in Docker Hub."""
     term = request.args.get('term')
     if not term:
-        return jsonify({
-            'error': 'Search term is required',
-            'success': False
-        }), 400
+        return _bad_request(_ERR_TERM_REQUIRED)
     
-    limit = int(request.args.get('limit', 25))
+    limit = _query_int('limit', 25)
     results = image_mgr.search_images(term, limit=limit)
     return jsonify({
         'results': results,
@@ -281,33 +473,27 @@ def search_images():
     })
 
 @app.route('/api/images/prune', methods=['POST'])
-@handle_error
 def prune_images():
     """Remove unused images."""
-    dangling_only = request.args.get('dangling_only', 'true').lower() == 'true'
-    result = image_mgr.prune_images(dangling_only=dangling_only)
+    dangling_only = _query_bool('dangling_only', True)
+    # Pruning walks every image on the daemon, so run it as a job too
+    job_id = submit_job('prune_images', image_mgr.prune_images, dangling_only=dangling_only)
     return jsonify({
-        'result': result,
+        'job_id': job_id,
+        'status_url': f"/api/jobs/{job_id}",
         'success': True
-    })
+    }), 202
 
 # ============================================================================
 # VOLUME ENDPOINTS
 # ============================================================================
 
 @app.route('/api/volumes', methods=['GET'])
-@handle_error
 def list_volumes():
     """List all volumes."""
-    volumes = volume_mgr.list_volumes()
-    return jsonify({
-        'volumes': volumes,
-        'count': len(volumes),
-        'success': True
-    })
+    return json_array_stream('volumes', volume_mgr.iter_volumes())
 
 @app.route('/api/volumes/<volume_name>', methods=['GET'])
-@handle_error
 def get_volume_details(volume_name):
     """Get details of a specific volume."""
     details = volume_mgr.get_volume_details(volume_name)
@@ -317,11 +503,9 @@ def get_volume_details(volume_name):
     })
 
 @app.route('/api/volumes', methods=['POST'])
-@handle_error
-def create_volume():
+@json_body()
+def create_volume(data):
     """Create a new volume."""
-    data = request.json or {}
-    
     name = data.get('name')
     driver = data.get('driver', 'local')
     labels = data.get('labels')
@@ -334,10 +518,9 @@ def create_volume():
     }), 201
 
 @app.route('/api/volumes/<volume_name>/remove', methods=['DELETE'])
-@handle_error
 def remove_volume(volume_name):
     """Remove a volume."""
-    force = request.args.get('force', 'false').lower() == 'true'
+    force = _query_bool('force')
     result = volume_mgr.remove_volume(volume_name, force=force)
     return jsonify({
         'result': result,
@@ -345,21 +528,20 @@ def remove_volume(volume_name):
     })
 
 @app.route('/api/volumes/prune', methods=['POST'])
-@handle_error
 def prune_volumes():
     """Remove unused volumes."""
-    result = volume_mgr.prune_volumes()
+    job_id = submit_job('prune_volumes', volume_mgr.prune_volumes)
     return jsonify({
-        'result': result,
+        'job_id': job_id,
+        'status_url': f"/api/jobs/{job_id}",
         'success': True
-    })
+    }), 202
 
 @app.route('/api/volumes/stats', methods=['GET'])
-@handle_error
 def get_volume_stats():
     """Get volume statistics."""
     stats = volume_mgr.get_volume_stats()
-    return jsonify({
+    return auto_serialize({
         'stats': stats,
         'success': True
     })
@@ -369,18 +551,11 @@ def get_volume_stats():
 # ============================================================================
 
 @app.route('/api/networks', methods=['GET'])
-@handle_error
 def list_networks():
     """List all networks."""
-    networks = network_mgr.list_networks()
-    return jsonify({
-        'networks': networks,
-        'count': len(networks),
-        'success': True
-    })
+    return json_array_stream('networks', network_mgr.iter_networks())
 
 @app.route('/api/networks/<network_id>', methods=['GET'])
-@handle_error
 def get_network_details(network_id):
     """Get details of a specific network."""
     details = network_mgr.get_network_details(network_id)
@@ -390,16 +565,9 @@ def get_network_details(network_id):
     })
 
 @app.route('/api/networks', methods=['POST'])
-@handle_error
-def create_network():
+@json_body('name', 'Network name is required')
+def create_network(data):
     """Create a new network."""
-    data = request.json
-    if not data or 'name' not in data:
-        return jsonify({
-            'error': 'Network name is required',
-            'success': False
-        }), 400
-    
     name = data['name']
     driver = data.get('driver', 'bridge')
     internal = data.get('internal', False)
@@ -418,7 +586,6 @@ def create_network():
     }), 201
 
 @app.route('/api/networks/<network_id>/remove', methods=['DELETE'])
-@handle_error
 def remove_network(network_id):
     """Remove a network."""
     result = network_mgr.remove_network(network_id)
@@ -428,16 +595,9 @@ def remove_network(network_id):
     })
 
 @app.route('/api/networks/<network_id>/connect', methods=['POST'])
-@handle_error
-def connect_container_to_network(network_id):
+@json_body('container', 'Container ID is required')
+def connect_container_to_network(network_id, data):
     """Connect a container to a network."""
-    data = request.json
-    if not data or 'container' not in data:
-        return jsonify({
-            'error': 'Container ID is required',
-            'success': False
-        }), 400
-    
     container_id = data['container']
     aliases = data.get('aliases')
     ipv4_address = data.get('ipv4_address')
@@ -453,16 +613,9 @@ def connect_container_to_network(network_id):
     })
 
 @app.route('/api/networks/<network_id>/disconnect', methods=['POST'])
-@handle_error
-def disconnect_container_from_network(network_id):
+@json_body('container', 'Container ID is required')
+def disconnect_container_from_network(network_id, data):
     """Disconnect a container from a network."""
-    data = request.json
-    if not data or 'container' not in data:
-        return jsonify({
-            'error': 'Container ID is required',
-            'success': False
-        }), 400
-    
     container_id = data['container']
     force = data.get('force', False)
     
@@ -473,21 +626,20 @@ def disconnect_container_from_network(network_id):
     })
 
 @app.route('/api/networks/prune', methods=['POST'])
-@handle_error
 def prune_networks():
     """Remove unused networks."""
-    result = network_mgr.prune_networks()
+    job_id = submit_job('prune_networks', network_mgr.prune_networks)
     return jsonify({
-        'result': result,
+        'job_id': job_id,
+        'status_url': f"/api/jobs/{job_id}",
         'success': True
-    })
+    }), 202
 
 @app.route('/api/networks/stats', methods=['GET'])
-@handle_error
 def get_network_stats():
     """Get network statistics."""
     stats = network_mgr.get_network_stats()
-    return jsonify({
+    return auto_serialize({
         'stats': stats,
         'success': True
     })
@@ -497,7 +649,7 @@ def get_network_stats():
 # ============================================================================
 
 @app.route('/api/system/version', methods=['GET'])
-@handle_error
+@cached_etag(ttl=2.0)
 def get_docker_version():
     """Get Docker version information."""
     version = system_mgr.get_docker_version()
@@ -507,117 +659,162 @@ def get_docker_version():
     })
 
 @app.route('/api/system/info', methods=['GET'])
-@handle_error
+@cached_etag(ttl=2.0)
 def get_system_info():
     """Get Docker system information."""
-    info = system_mgr.get_system_info()
+    fields = request.args.get('fields')
+    info = system_mgr.get_system_info(fields=set(fields.split(',')) if fields else None)
     return jsonify({
         'info': info,
         'success': True
     })
 
 @app.route('/api/system/df', methods=['GET'])
-@handle_error
 def get_disk_usage():
     """Get Docker disk usage information."""
-    usage = system_mgr.get_disk_usage()
-    return jsonify({
+    usage = system_mgr.get_disk_usage(refresh=_query_bool('refresh'))
+    return auto_serialize({
         'usage': usage,
         'success': True
     })
 
 @app.route('/api/system/status', methods=['GET'])
-@handle_error
 def get_daemon_status():
     """Get Docker daemon status."""
     status = system_mgr.get_daemon_status()
-    return jsonify({
+    return auto_serialize({
         'status': status,
         'success': True
     })
 
 @app.route('/api/system/stats', methods=['GET'])
-@handle_error
 def get_overall_statistics():
     """Get overall Docker statistics."""
     stats = system_mgr.get_overall_statistics()
-    return jsonify({
+    return auto_serialize({
         'stats': stats,
         'success': True
     })
 
 @app.route('/api/system/host', methods=['GET'])
-@handle_error
 def get_host_system_info():
     """Get host system information."""
     host_info = system_mgr.get_host_system_info()
-    return jsonify({
+    return auto_serialize({
         'host': host_info,
         'success': True
     })
 
+# ============================================================================
+# JOB ENDPOINTS
+# ============================================================================
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """Get the status and result of a background job."""
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({
+            'error': f"Job '{job_id}' not found",
+            'success': False
+        }), 404
+    return jsonify({
+        'job': job,
+        'success': True
+    })
+
 # ============================================================================
 # UTILITY ENDPOINTS
 # ============================================================================
 
+# Static description of the API, served by /api/commands
+COMMANDS = {
+    'containers': {
+        'list': 'GET /api/containers - List all containers (add ?all=true for all)',
+        'details': 'GET /api/containers/{id} - Get container details',
+        'batch': 'POST /api/containers/batch - Get details of several containers',
+        'create': 'POST /api/containers - Create new container',
+        'start': 'POST /api/containers/{id}/start - Start container',
+        'stop': 'POST /api/containers/{id}/stop - Stop container',
+        'restart': 'POST /api/containers/{id}/restart - Restart container',
+        'remove': 'DELETE /api/containers/{id}/remove - Remove container',
+        'logs': 'GET /api/containers/{id}/logs - Get container logs',
+        'logs_stream': 'GET /api/containers/{id}/logs/stream - Stream container logs as plain text'
+    },
+    'images': {
+        'list': 'GET /api/images - List all images',
+        'details': 'GET /api/images/{id} - Get image details (add ?history=true for layer history)',
+        'pull': 'POST /api/images/pull - Pull image from registry (returns a job)',
+        'build': 'POST /api/images/build - Build image from Dockerfile or uploaded tar context (returns a job)',
+        'remove': 'DELETE /api/images/{id}/remove - Remove image',
+        'search': 'GET /api/images/search?term={term} - Search Docker Hub',
+        'prune': 'POST /api/images/prune - Remove unused images (returns a job)'
+    },
+    'volumes': {
+        'list': 'GET /api/volumes - List all volumes',
+        'details': 'GET /api/volumes/{name} - Get volume details',
+        'create': 'POST /api/volumes - Create new volume',
+        'remove': 'DELETE /api/volumes/{name}/remove - Remove volume',
+        'prune': 'POST /api/volumes/prune - Remove unused volumes (returns a job)',
+        'stats': 'GET /api/volumes/stats - Get volume statistics'
+    },
+    'networks': {
+        'list': 'GET /api/networks - List all networks',
+        'details': 'GET /api/networks/{id} - Get network details',
+        'create': 'POST /api/networks - Create new network',
+        'remove': 'DELETE /api/networks/{id}/remove - Remove network',
+        'connect': 'POST /api/networks/{id}/connect - Connect container to network',
+        'disconnect': 'POST /api/networks/{id}/disconnect - Disconnect container from network',
+        'prune': 'POST /api/networks/prune - Remove unused networks (returns a job)',
+        'stats': 'GET /api/networks/stats - Get network statistics'
+    },
+    'system': {
+        'version': 'GET /api/system/version - Get Docker version',
+        'info': 'GET /api/system/info - Get system information (add ?fields=name,swarm to limit the keys)',
+        'df': 'GET /api/system/df - Get disk usage (add ?refresh=true to bypass the 30s cache)',
+        'status': 'GET /api/system/status - Get daemon status',
+        'stats': 'GET /api/system/stats - Get overall statistics',
+        'host': 'GET /api/system/host - Get host system info'
+    },
+    'jobs': {
+        'status': 'GET /api/jobs/{id} - Get background job status and result'
+    }
+}
+
+@lru_cache(maxsize=8)
+def _commands_body(base_url: str) -> bytes:
+    """Serialize the /api/commands payload once per base URL."""
+    return app.json.dumps_bytes({
+        'commands': COMMANDS,
+        'base_url': base_url,
+        'success': True
+    }) + b'\n'
+
 @app.route('/api/commands', methods=['GET'])
+@cached_etag()
 def get_available_commands():
     """Get list of available Docker commands and their descriptions."""
-    commands = {
-        'containers': {
-            'list': 'GET /api/containers - List all containers (add ?all=true for all)',
-            'details': 'GET /api/containers/{id} - Get container details',
-            'create': 'POST /api/containers - Create new container',
-            'start': 'POST /api/containers/{id}/start - Start container',
-            'stop': 'POST /api/containers/{id}/stop - Stop container',
-            'restart': 'POST /api/containers/{id}/restart - Restart container',
-            'remove': 'DELETE /api/containers/{id}/remove - Remove container',
-            'logs': 'GET /api/containers/{id}/logs - Get container logs'
-        },
-        'images': {
-            'list': 'GET /api/images - List all images',
-            'details': 'GET /api/images/{id} - Get image details',
-            'pull': 'POST /api/images/pull - Pull image from registry',
-            'build': 'POST /api/images/build - Build image from Dockerfile',
-            'remove': 'DELETE /api/images/{id}/remove - Remove image',
-            'search': 'GET /api/images/search?term={term} - Search Docker Hub',
-            'prune': 'POST /api/images/prune - Remove unused images'
-        },
-        'volumes': {
-            'list': 'GET /api/volumes - List all volumes',
-            'details': 'GET /api/volumes/{name} - Get volume details',
-            'create': 'POST /api/volumes - Create new volume',
-            'remove': 'DELETE /api/volumes/{name}/remove - Remove volume',
-            'prune': 'POST /api/volumes/prune - Remove unused volumes',
-            'stats': 'GET /api/volumes/stats - Get volume statistics'
-        },
-        'networks': {
-            'list': 'GET /api/networks - List all networks',
-            'details': 'GET /api/networks/{id} - Get network details',
-            'create': 'POST /api/networks - Create new network',
-            'remove': 'DELETE /api/networks/{id}/remove - Remove network',
-            'connect': 'POST /api/networks/{id}/connect - Connect container to network',
-            'disconnect': 'POST /api/networks/{id}/disconnect - Disconnect container from network',
-            'prune': 'POST /api/networks/prune - Remove unused networks',
-            'stats': 'GET /api/networks/stats - Get network statistics'
-        },
-        'system': {
-            'version': 'GET /api/system/version - Get Docker version',
-            'info': 'GET /api/system/info - Get system information',
-            'df': 'GET /api/system/df - Get disk usage',
-            'status': 'GET /api/system/status - Get daemon status',
-            'stats': 'GET /api/system/stats - Get overall statistics',
-            'host': 'GET /api/system/host - Get host system info'
-        }
-    }
-    
-    return jsonify({
-        'commands': commands,
-        'base_url': request.base_url.replace('/api/commands', ''),
-        'success': True
-    })
+    body = _commands_body(request.base_url.replace('/api/commands', ''))
+    return Response(body, mimetype='application/json')
 
 # Static file serving (for frontend if needed)
+# Browser cache lifetimes for the frontend: assets are kept for a year,
+# index.html is revalidated on every load so new deployments show up
+STATIC_MAX_AGE = 365 * 24 * 3600
+INDEX_MAX_AGE = 0
+
+def _list_static_files(folder: str) -> frozenset:
+    """List the files under the static folder once, as URL paths relative to it."""
+    files = set()
+    for root, _, names in os.walk(folder or ''):
+        for name in names:
+            files.add(os.path.relpath(os.path.join(root, name), folder).replace(os.sep, '/'))
+    return frozenset(files)
+
+# Files are looked up in this set instead of stat-ing the disk per request;
+# files added to the static folder are picked up on restart
+_STATIC_FILES = _list_static_files(app.static_folder)
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
@@ -630,12 +827,11 @@ def serve(path):
             'health': '/health'
         })
 
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
+    if path != "" and path != 'index.html' and path in _STATIC_FILES:
+        return send_from_directory(static_folder_path, path, max_age=STATIC_MAX_AGE, conditional=True)
     else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
+        if 'index.html' in _STATIC_FILES:
+            return send_from_directory(static_folder_path, 'index.html', max_age=INDEX_MAX_AGE, conditional=True)
         else:
             return jsonify({
                 'message': 'Docker Management API',
@@ -645,8 +841,11 @@ def serve(path):
             })
 
 if __name__ == '__main__':
+    host = os.environ.get('API_HOST', '0.0.0.0')
+    port = int(os.environ.get('API_PORT', 5000))
+    debug = os.environ.get('API_DEBUG', 'false') in _TRUTHY
     print("Starting Docker Management API...")
-    print("API Documentation: http://localhost:5000/api/commands")
-    print("Health Check: http://localhost:5000/health")
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    print(f"API Documentation: http://localhost:{port}/api/commands")
+    print(f"Health Check: http://localhost:{port}/health")
+    app.run(host=host, port=port, debug=debug, threaded=True)
 
@@ -1,6 +1,28 @@
+import cachetools
+from concurrent.futures import ThreadPoolExecutor
 import docker
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 import logging
+import re
+import threading
+import time
+
+from src.cache import cached_iterator, cached_method, clear_cache
+from src.docker_client import get_client
+from src.errors import DockerOpError
+
+logger = logging.getLogger(__name__)
+
+# Docker error messages that map to friendlier errors
+_ALREADY_EXISTS = re.compile(r'already exists', re.IGNORECASE)
+_HAS_ACTIVE_ENDPOINTS = re.compile(r'has active endpoints', re.IGNORECASE)
+_NETWORK = re.compile(r'network', re.IGNORECASE)
+
+# Networks every Docker daemon creates itself
+_SYSTEM_NETWORKS = frozenset({'bridge', 'host', 'none'})
+
+# Seconds to wait before resubscribing after the event stream drops
+_EVENTS_RETRY_DELAY = 5.0
 
 class NetworkManager:
     """
@@ -8,15 +30,24 @@ class NetworkManager:
     and connecting/disconnecting containers to networks.
     """
     
-    def __init__(self):
-        """Initialize Docker client connection."""
-        try:
-            self.client = docker.from_env()
-            # Test connection
-            self.client.ping()
-        except Exception as e:
-            logging.error(f"Failed to connect to Docker daemon: {e}")
-            raise ConnectionError("Cannot connect to Docker daemon. Make sure Docker is running.")
+    def __init__(self, client: Optional[docker.DockerClient] = None, watch_events: bool = True):
+        """
+        Initialize the manager.
+        
+        Args:
+            client (docker.DockerClient, optional): Docker client to use (defaults to the shared client)
+            watch_events (bool): Invalidate the cache from the daemon's network events
+        """
+        self.client = client or get_client()
+        # Cache for read operations polled by dashboards; with the event
+        # watcher running, entries are dropped as soon as a network changes
+        # and the TTL only bounds staleness if the event stream is down
+        self._cache = cachetools.TTLCache(maxsize=64, ttl=30.0 if watch_events else 2.0)
+        self._cache_lock = threading.RLock()
+        # Pool for inspecting networks concurrently when listing them
+        self._inspect_executor = ThreadPoolExecutor(max_workers=10, thread_name_prefix='network-inspect')
+        if watch_events:
+            threading.Thread(target=self._watch_events, name='network-events', daemon=True).start()
     
     def list_networks(self) -> List[Dict[str, Any]]:
         """
@@ -25,32 +56,36 @@ class NetworkManager:
         Returns:
             List[Dict]: List of network information dictionaries
         """
+        return list(self.iter_networks())
+    
+    @cached_iterator('list_networks')
+    def iter_networks(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield network information one network at a time, for streaming responses.
+        
+        Returns:
+            Iterator[Dict]: Network information dictionaries
+        """
         try:
-            networks = self.client.networks.list()
-            network_list = []
-            
-            for network in networks:
-                network_info = {
-                    'id': network.id[:12],
-                    'name': network.name,
-                    'driver': network.attrs.get('Driver', 'unknown'),
-                    'scope': network.attrs.get('Scope', 'local'),
-                    'created': network.attrs.get('Created', ''),
-                    'internal': network.attrs.get('Internal', False),
-                    'attachable': network.attrs.get('Attachable', False),
-                    'ingress': network.attrs.get('Ingress', False),
-                    'ipam': self._format_ipam(network.attrs.get('IPAM', {})),
-                    'labels': network.attrs.get('Labels') or {},
-                    'containers': self._get_network_containers(network),
-                    'options': network.attrs.get('Options') or {}
+            for attrs in self._inspect_networks():
+                yield {
+                    'id': attrs['Id'][:12],
+                    'name': attrs.get('Name'),
+                    'driver': attrs.get('Driver', 'unknown'),
+                    'scope': attrs.get('Scope', 'local'),
+                    'created': attrs.get('Created', ''),
+                    'internal': attrs.get('Internal', False),
+                    'attachable': attrs.get('Attachable', False),
+                    'ingress': attrs.get('Ingress', False),
+                    'ipam': self._format_ipam(attrs.get('IPAM', {})),
+                    'labels': attrs.get('Labels') or {},
+                    'containers': self._get_network_containers(attrs),
+                    'options': attrs.get('Options') or {}
                 }
-                network_list.append(network_info)
-            
-            return network_list
         except Exception as e:
-            logging.error(f"Error listing networks: {e}")
-            raise Exception(f"Failed to list networks: {str(e)}")
+            raise DockerOpError(f"Failed to list networks: {str(e)}") from e
     
+    @cached_method('get_network_details')
     def get_network_details(self, network_id: str) -> Dict[str, Any]:
         """
         Get detailed information about a specific network.
@@ -62,32 +97,32 @@ class NetworkManager:
             Dict: Detailed network information
         """
         try:
-            network = self.client.networks.get(network_id)
+            # Read-only, so the raw inspect data is enough; no Network model needed
+            attrs = self.client.api.inspect_network(network_id)
             
             details = {
-                'id': network.id,
-                'name': network.name,
-                'driver': network.attrs.get('Driver', 'unknown'),
-                'scope': network.attrs.get('Scope', 'local'),
-                'created': network.attrs.get('Created', ''),
-                'internal': network.attrs.get('Internal', False),
-                'attachable': network.attrs.get('Attachable', False),
-                'ingress': network.attrs.get('Ingress', False),
-                'enable_ipv6': network.attrs.get('EnableIPv6', False),
-                'ipam': self._format_ipam(network.attrs.get('IPAM', {})),
-                'labels': network.attrs.get('Labels') or {},
-                'options': network.attrs.get('Options') or {},
-                'containers': self._get_network_containers(network),
-                'config_from': network.attrs.get('ConfigFrom', {}),
-                'config_only': network.attrs.get('ConfigOnly', False)
+                'id': attrs['Id'],
+                'name': attrs.get('Name'),
+                'driver': attrs.get('Driver', 'unknown'),
+                'scope': attrs.get('Scope', 'local'),
+                'created': attrs.get('Created', ''),
+                'internal': attrs.get('Internal', False),
+                'attachable': attrs.get('Attachable', False),
+                'ingress': attrs.get('Ingress', False),
+                'enable_ipv6': attrs.get('EnableIPv6', False),
+                'ipam': self._format_ipam(attrs.get('IPAM', {})),
+                'labels': attrs.get('Labels') or {},
+                'options': attrs.get('Options') or {},
+                'containers': self._get_network_containers(attrs),
+                'config_from': attrs.get('ConfigFrom', {}),
+                'config_only': attrs.get('ConfigOnly', False)
             }
             
             return details
         except docker.errors.NotFound:
-            raise Exception(f"Network '{network_id}' not found")
+            raise DockerOpError(f"Network '{network_id}' not found")
         except Exception as e:
-            logging.error(f"Error getting network details: {e}")
-            raise Exception(f"Failed to get network details: {str(e)}")
+            raise DockerOpError(f"Failed to get network details: {str(e)}") from e
     
     def create_network(self, name: str, driver: str = 'bridge', 
                       internal: bool = False, attachable: bool = False,
@@ -119,6 +154,7 @@ class NetworkManager:
                 options=options or {},
                 ipam=ipam
             )
+            self.invalidate_cache()
             
             return {
                 'message': f"Network '{name}' created successfully",
@@ -131,12 +167,11 @@ class NetworkManager:
                 'status': 'created'
             }
         except docker.errors.APIError as e:
-            if 'already exists' in str(e).lower():
-                raise Exception(f"Network '{name}' already exists")
-            raise Exception(f"Failed to create network: {str(e)}")
+            if _ALREADY_EXISTS.search(str(e)):
+                raise DockerOpError(f"Network '{name}' already exists") from e
+            raise DockerOpError(f"Failed to create network: {str(e)}") from e
         except Exception as e:
-            logging.error(f"Error creating network: {e}")
-            raise Exception(f"Failed to create network: {str(e)}")
+            raise DockerOpError(f"Failed to create network: {str(e)}") from e
     
     def remove_network(self, network_id: str) -> Dict[str, str]:
         """
@@ -153,12 +188,13 @@ class NetworkManager:
             network_name = network.name
             
             # Check if network is in use
-            containers = self._get_network_containers(network)
+            containers = self._get_network_containers(network.attrs)
             if containers:
                 container_names = [c['name'] for c in containers]
-                raise Exception(f"Cannot remove network '{network_name}' - it's being used by containers: {', '.join(container_names)}. Disconnect containers first")
+                raise DockerOpError(f"Cannot remove network '{network_name}' - it's being used by containers: {', '.join(container_names)}. Disconnect containers first")
             
             network.remove()
+            self.invalidate_cache()
             
             return {
                 'message': f"Network '{network_name}' removed successfully",
@@ -167,16 +203,15 @@ class NetworkManager:
                 'status': 'removed'
             }
         except docker.errors.NotFound:
-            raise Exception(f"Network '{network_id}' not found")
+            raise DockerOpError(f"Network '{network_id}' not found")
         except docker.errors.APIError as e:
-            if 'has active endpoints' in str(e).lower():
-                raise Exception(f"Cannot remove network '{network_id}' - it has active endpoints. Disconnect containers first")
-            raise Exception(f"Failed to remove network: {str(e)}")
+            if _HAS_ACTIVE_ENDPOINTS.search(str(e)):
+                raise DockerOpError(f"Cannot remove network '{network_id}' - it has active endpoints. Disconnect containers first") from e
+            raise DockerOpError(f"Failed to remove network: {str(e)}") from e
+        except DockerOpError:
+            raise
         except Exception as e:
-            if "it's being used by containers" in str(e):
-                raise e
-            logging.error(f"Error removing network: {e}")
-            raise Exception(f"Failed to remove network: {str(e)}")
+            raise DockerOpError(f"Failed to remove network: {str(e)}") from e
     
     def connect_container(self, network_id: str, container_id: str, 
                          aliases: Optional[List[str]] = None,
@@ -199,10 +234,9 @@ class NetworkManager:
             network = self.client.networks.get(network_id)
             container = self.client.containers.get(container_id)
             
-            # Check if container is already connected
-            current_containers = self._get_network_containers(network)
-            if any(c['id'] == container.id[:12] for c in current_containers):
-                raise Exception(f"Container '{container.name}' is already connected to network '{network.name}'")
+            # Check if container is already connected (keyed by full container ID)
+            if container.id in (network.attrs.get('Containers') or {}):
+                raise DockerOpError(f"Container '{container.name}' is already connected to network '{network.name}'")
             
             network.connect(
                 container,
@@ -210,6 +244,7 @@ class NetworkManager:
                 ipv4_address=ipv4_address,
                 ipv6_address=ipv6_address
             )
+            self.invalidate_cache()
             
             return {
                 'message': f"Container '{container.name}' connected to network '{network.name}' successfully",
@@ -220,17 +255,16 @@ class NetworkManager:
                 'status': 'connected'
             }
         except docker.errors.NotFound as e:
-            if 'network' in str(e).lower():
-                raise Exception(f"Network '{network_id}' not found")
+            if _NETWORK.search(str(e)):
+                raise DockerOpError(f"Network '{network_id}' not found") from e
             else:
-                raise Exception(f"Container '{container_id}' not found")
+                raise DockerOpError(f"Container '{container_id}' not found") from e
         except docker.errors.APIError as e:
-            raise Exception(f"Failed to connect container to network: {str(e)}")
+            raise DockerOpError(f"Failed to connect container to network: {str(e)}") from e
+        except DockerOpError:
+            raise
         except Exception as e:
-            if "already connected" in str(e):
-                raise e
-            logging.error(f"Error connecting container to network: {e}")
-            raise Exception(f"Failed to connect container to network: {str(e)}")
+            raise DockerOpError(f"Failed to connect container to network: {str(e)}") from e
     
     def disconnect_container(self, network_id: str, container_id: str, force: bool = False) -> Dict[str, str]:
         """
@@ -248,12 +282,12 @@ class NetworkManager:
             network = self.client.networks.get(network_id)
             container = self.client.containers.get(container_id)
             
-            # Check if container is connected
-            current_containers = self._get_network_containers(network)
-            if not any(c['id'] == container.id[:12] for c in current_containers):
-                raise Exception(f"Container '{container.name}' is not connected to network '{network.name}'")
+            # Check if container is connected (keyed by full container ID)
+            if container.id not in (network.attrs.get('Containers') or {}):
+                raise DockerOpError(f"Container '{container.name}' is not connected to network '{network.name}'")
             
             network.disconnect(container, force=force)
+            self.invalidate_cache()
             
             return {
                 'message': f"Container '{container.name}' disconnected from network '{network.name}' successfully",
@@ -264,17 +298,16 @@ class NetworkManager:
                 'status': 'disconnected'
             }
         except docker.errors.NotFound as e:
-            if 'network' in str(e).lower():
-                raise Exception(f"Network '{network_id}' not found")
+            if _NETWORK.search(str(e)):
+                raise DockerOpError(f"Network '{network_id}' not found") from e
             else:
-                raise Exception(f"Container '{container_id}' not found")
+                raise DockerOpError(f"Container '{container_id}' not found") from e
         except docker.errors.APIError as e:
-            raise Exception(f"Failed to disconnect container from network: {str(e)}")
+            raise DockerOpError(f"Failed to disconnect container from network: {str(e)}") from e
+        except DockerOpError:
+            raise
         except Exception as e:
-            if "not connected" in str(e):
-                raise e
-            logging.error(f"Error disconnecting container from network: {e}")
-            raise Exception(f"Failed to disconnect container from network: {str(e)}")
+            raise DockerOpError(f"Failed to disconnect container from network: {str(e)}") from e
     
     def prune_networks(self) -> Dict[str, Any]:
         """
@@ -285,14 +318,14 @@ class NetworkManager:
         """
         try:
             result = self.client.networks.prune()
+            self.invalidate_cache()
             
             return {
                 'message': 'Network pruning completed',
                 'networks_deleted': result.get('NetworksDeleted', [])
             }
         except Exception as e:
-            logging.error(f"Error pruning networks: {e}")
-            raise Exception(f"Failed to prune networks: {str(e)}")
+            raise DockerOpError(f"Failed to prune networks: {str(e)}") from e
     
     def inspect_network(self, network_id: str) -> Dict[str, Any]:
         """
@@ -306,33 +339,82 @@ class NetworkManager:
         """
         return self.get_network_details(network_id)
     
-    def _get_network_containers(self, network) -> List[Dict[str, str]]:
+    @cached_iterator('_inspect_networks')
+    def _inspect_networks(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every network with its full inspect data, in listing order.
+        
+        The network listing leaves 'Containers' empty on API 1.28 and later,
+        so each network is inspected as well; the inspections run
+        concurrently instead of one after another. The result is cached, so
+        the listing and the statistics share one pass over the daemon.
+        
+        Returns:
+            Iterator[Dict]: Raw network inspect data, without docker-py models
+        """
+        network_ids = [summary['Id'] for summary in self.client.api.networks()]
+        for attrs in self._inspect_executor.map(self._inspect_network, network_ids):
+            if attrs is not None:
+                yield attrs
+    
+    def _inspect_network(self, network_id: str) -> Optional[Dict[str, Any]]:
+        """Inspect one network, or return None if it was removed after being listed."""
+        try:
+            return self.client.api.inspect_network(network_id)
+        except docker.errors.NotFound:
+            return None
+    
+    def invalidate_cache(self):
+        """Drop cached network listings, details and statistics after a change."""
+        clear_cache(self)
+    
+    def _watch_events(self):
+        """
+        Invalidate the cache whenever the daemon reports a network event.
+        
+        Runs for the life of the process on a daemon thread. Network events
+        cover changes made outside this API too, including containers
+        joining or leaving networks as they start and stop. The cache is
+        also cleared whenever the stream is (re)opened, since changes may
+        have been missed while it was down.
+        """
+        while True:
+            try:
+                events = self.client.events(decode=True, filters={'type': 'network'})
+                self.invalidate_cache()
+                for _ in events:
+                    self.invalidate_cache()
+            except Exception as e:
+                logger.error("Error watching network events: %s", e)
+            self.invalidate_cache()
+            time.sleep(_EVENTS_RETRY_DELAY)
+    
+    def _get_network_containers(self, attrs: Dict[str, Any]) -> List[Dict[str, str]]:
         """
         Get list of containers connected to a network.
         
         Args:
-            network: Docker network object
+            attrs (dict): Network inspect data (e.g. Network.attrs)
             
         Returns:
             List[Dict]: List of connected containers
         """
-        try:
-            containers = []
-            network_containers = network.attrs.get('Containers', {})
-            
-            for container_id, container_info in network_containers.items():
-                containers.append({
-                    'id': container_id[:12],
-                    'name': container_info.get('Name', 'unknown'),
-                    'ipv4_address': container_info.get('IPv4Address', '').split('/')[0] if container_info.get('IPv4Address') else '',
-                    'ipv6_address': container_info.get('IPv6Address', '').split('/')[0] if container_info.get('IPv6Address') else '',
-                    'mac_address': container_info.get('MacAddress', ''),
-                    'endpoint_id': container_info.get('EndpointID', '')[:12]
-                })
-            
-            return containers
-        except Exception:
+        network_containers = attrs.get('Containers')
+        if not isinstance(network_containers, dict):
             return []
+        
+        containers = []
+        for container_id, container_info in network_containers.items():
+            containers.append({
+                'id': container_id[:12],
+                'name': container_info.get('Name', 'unknown'),
+                'ipv4_address': container_info.get('IPv4Address', '').split('/')[0] if container_info.get('IPv4Address') else '',
+                'ipv6_address': container_info.get('IPv6Address', '').split('/')[0] if container_info.get('IPv6Address') else '',
+                'mac_address': container_info.get('MacAddress', ''),
+                'endpoint_id': (container_info.get('EndpointID') or '')[:12]
+            })
+        
+        return containers
     
     def _format_ipam(self, ipam_config: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -344,31 +426,33 @@ class NetworkManager:
         Returns:
             Dict: Formatted IPAM configuration
         """
-        try:
-            formatted_ipam = {
-                'driver': ipam_config.get('Driver', 'default'),
-                'options': ipam_config.get('Options') or {},
-                'config': []
-            }
-            
-            config_list = ipam_config.get('Config', [])
-            for config in config_list:
-                formatted_config = {
-                    'subnet': config.get('Subnet', ''),
-                    'gateway': config.get('Gateway', ''),
-                    'ip_range': config.get('IPRange', ''),
-                    'aux_addresses': config.get('AuxiliaryAddresses') or {}
-                }
-                formatted_ipam['config'].append(formatted_config)
-            
-            return formatted_ipam
-        except Exception:
+        if not isinstance(ipam_config, dict):
             return {
                 'driver': 'unknown',
                 'options': {},
                 'config': []
             }
+        
+        formatted_ipam = {
+            'driver': ipam_config.get('Driver', 'default'),
+            'options': ipam_config.get('Options') or {},
+            'config': []
+        }
+        
+        # 'Config' is null for networks created without IPAM settings
+        config_list = ipam_config.get('Config') or []
+        for config in config_list:
+            formatted_config = {
+                'subnet': config.get('Subnet', ''),
+                'gateway': config.get('Gateway', ''),
+                'ip_range': config.get('IPRange', ''),
+                'aux_addresses': config.get('AuxiliaryAddresses') or {}
+            }
+            formatted_ipam['config'].append(formatted_config)
+        
+        return formatted_ipam
     
+    @cached_method('get_network_stats')
     def get_network_stats(self) -> Dict[str, Any]:
         """
         Get overall network statistics.
@@ -377,31 +461,34 @@ class NetworkManager:
             Dict: Network statistics
         """
         try:
-            networks = self.client.networks.list()
+            # Networks are inspected concurrently, since the listing alone
+            # does not include connected containers
+            networks = list(self._inspect_networks())
             
             # Count networks by driver
             drivers = {}
             scopes = {}
             total_containers = 0
+            system_networks = 0
             
-            for network in networks:
-                driver = network.attrs.get('Driver', 'unknown')
-                scope = network.attrs.get('Scope', 'local')
+            for attrs in networks:
+                driver = attrs.get('Driver', 'unknown')
+                scope = attrs.get('Scope', 'local')
                 
                 drivers[driver] = drivers.get(driver, 0) + 1
                 scopes[scope] = scopes.get(scope, 0) + 1
                 
-                containers = self._get_network_containers(network)
-                total_containers += len(containers)
+                total_containers += len(attrs.get('Containers') or {})
+                if attrs.get('Name') in _SYSTEM_NETWORKS:
+                    system_networks += 1
             
             return {
                 'total_networks': len(networks),
                 'drivers': drivers,
                 'scopes': scopes,
                 'total_connected_containers': total_containers,
-                'system_networks': len([n for n in networks if n.name in ['bridge', 'host', 'none']])
+                'system_networks': system_networks
             }
         except Exception as e:
-            logging.error(f"Error getting network stats: {e}")
-            raise Exception(f"Failed to get network statistics: {str(e)}")
+            raise DockerOpError(f"Failed to get network statistics: {str(e)}") from e
 
@@ -1,8 +1,35 @@
+import cachetools
+from concurrent.futures import ThreadPoolExecutor
 import docker
-from typing import Dict, List, Any
+from typing import AbstractSet, Dict, List, Any, Optional
 import logging
 import platform
 import psutil
+import threading
+import time
+
+from src.cache import cached_df, cached_method
+from src.docker_client import get_client
+from src.errors import DockerOpError
+from src.formatting import format_size
+
+logger = logging.getLogger(__name__)
+
+# Window over which the background sampler measures host CPU usage
+CPU_SAMPLE_INTERVAL = 1.0
+
+# Host facts that cannot change while the process runs (platform.platform()
+# and processor() may run uname or a subprocess), read once at import
+_STATIC_HOST = {
+    'platform': platform.platform(),
+    'system': platform.system(),
+    'release': platform.release(),
+    'version': platform.version(),
+    'machine': platform.machine(),
+    'processor': platform.processor(),
+    'python_version': platform.python_version(),
+    'cpu_count': psutil.cpu_count()
+}
 
 class SystemManager:
     """
@@ -10,15 +37,23 @@ class SystemManager:
     disk usage, and monitoring Docker daemon status.
     """
     
-    def __init__(self):
-        """Initialize Docker client connection."""
-        try:
-            self.client = docker.from_env()
-            # Test connection
-            self.client.ping()
-        except Exception as e:
-            logging.error(f"Failed to connect to Docker daemon: {e}")
-            raise ConnectionError("Cannot connect to Docker daemon. Make sure Docker is running.")
+    def __init__(self, client: Optional[docker.DockerClient] = None):
+        """
+        Initialize the manager.
+        
+        Args:
+            client (docker.DockerClient, optional): Docker client to use (defaults to the shared client)
+        """
+        self.client = client or get_client()
+        # Very short-lived cache so frequent health probes share daemon round-trips
+        self._cache = cachetools.TTLCache(maxsize=16, ttl=0.5)
+        self._cache_lock = threading.RLock()
+        # Pool for fanning out the independent daemon calls behind one status or summary
+        self._stats_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='system-stats')
+        # Latest host CPU usage, kept current by a background sampler so
+        # requests never wait out a measurement interval
+        self._cpu_percent = 0.0
+        threading.Thread(target=self._sample_cpu, name='host-cpu', daemon=True).start()
     
     def get_docker_version(self) -> Dict[str, Any]:
         """
@@ -43,13 +78,16 @@ class SystemManager:
                 'experimental': version_info.get('Experimental', False)
             }
         except Exception as e:
-            logging.error(f"Error getting Docker version: {e}")
-            raise Exception(f"Failed to get Docker version: {str(e)}")
+            raise DockerOpError(f"Failed to get Docker version: {str(e)}") from e
     
-    def get_system_info(self) -> Dict[str, Any]:
+    def get_system_info(self, fields: Optional[AbstractSet[str]] = None) -> Dict[str, Any]:
         """
         Get Docker system information.
         
+        Args:
+            fields (set, optional): Keys to include (all when None); the swarm
+                and plugins sections are only formatted when requested
+                
         Returns:
             Dict: System information
         """
@@ -72,7 +110,7 @@ class SystemManager:
                 'os_type': info.get('OSType', 'unknown'),
                 'architecture': info.get('Architecture', 'unknown'),
                 'ncpu': info.get('NCPU', 0),
-                'mem_total': self._format_size(info.get('MemTotal', 0)),
+                'mem_total': format_size(info.get('MemTotal', 0)),
                 'mem_total_bytes': info.get('MemTotal', 0),
                 'docker_root_dir': info.get('DockerRootDir', 'unknown'),
                 'http_proxy': info.get('HttpProxy', ''),
@@ -83,83 +121,107 @@ class SystemManager:
                 'experimental_build': info.get('ExperimentalBuild', False),
                 'live_restore_enabled': info.get('LiveRestoreEnabled', False),
                 'default_runtime': info.get('DefaultRuntime', 'unknown'),
-                'runtimes': list(info.get('Runtimes', {}).keys()),
-                'swarm': self._format_swarm_info(info.get('Swarm', {})),
-                'plugins': self._format_plugins_info(info.get('Plugins', {}))
+                'runtimes': list(info.get('Runtimes', {}).keys())
             }
+            if fields is None or 'swarm' in fields:
+                system_info['swarm'] = self._format_swarm_info(info.get('Swarm', {}))
+            if fields is None or 'plugins' in fields:
+                system_info['plugins'] = self._format_plugins_info(info.get('Plugins', {}))
             
+            if fields is not None:
+                return {key: value for key, value in system_info.items() if key in fields}
             return system_info
         except Exception as e:
-            logging.error(f"Error getting system info: {e}")
-            raise Exception(f"Failed to get system info: {str(e)}")
+            raise DockerOpError(f"Failed to get system info: {str(e)}") from e
     
-    def get_disk_usage(self) -> Dict[str, Any]:
+    def get_disk_usage(self, refresh: bool = False) -> Dict[str, Any]:
         """
         Get Docker disk usage information.
         
+        Args:
+            refresh (bool): Query the daemon again instead of using the cached disk usage
+            
         Returns:
             Dict: Disk usage details
         """
         try:
-            df_info = self.client.df()
+            df_info = cached_df(self.client, refresh=refresh)
             
+            # Each list is walked once, accumulating all of its totals
             # Process containers
-            containers_info = df_info.get('Containers', [])
-            containers_size = sum(c.get('SizeRw', 0) + c.get('SizeRootFs', 0) for c in containers_info)
+            containers_info = df_info.get('Containers') or []
+            containers_size = containers_reclaimable = 0
+            for c in containers_info:
+                size_rw = c.get('SizeRw', 0)
+                containers_size += size_rw + c.get('SizeRootFs', 0)
+                if c.get('State') != 'running':
+                    containers_reclaimable += size_rw
             
             # Process images
-            images_info = df_info.get('Images', [])
-            images_size = sum(img.get('Size', 0) for img in images_info)
-            images_shared_size = sum(img.get('SharedSize', 0) for img in images_info)
+            images_info = df_info.get('Images') or []
+            images_size = images_shared_size = images_reclaimable = 0
+            for img in images_info:
+                size = img.get('Size', 0)
+                images_size += size
+                images_shared_size += img.get('SharedSize', 0)
+                if not img.get('Containers', 0):
+                    images_reclaimable += size
             
             # Process volumes
-            volumes_info = df_info.get('Volumes', [])
-            volumes_size = sum(vol.get('Size', 0) for vol in volumes_info)
+            volumes_info = df_info.get('Volumes') or []
+            volumes_size = volumes_reclaimable = 0
+            for vol in volumes_info:
+                size = vol.get('Size', 0)
+                volumes_size += size
+                if vol.get('RefCount', 0) == 0:
+                    volumes_reclaimable += size
             
             # Process build cache
-            build_cache_info = df_info.get('BuildCache', [])
+            build_cache_info = df_info.get('BuildCache') or []
             build_cache_size = sum(cache.get('Size', 0) for cache in build_cache_info)
             
+            total_size = containers_size + images_size + volumes_size + build_cache_size
+            
             return {
                 'containers': {
                     'count': len(containers_info),
-                    'size': self._format_size(containers_size),
+                    'size': format_size(containers_size),
                     'size_bytes': containers_size,
-                    'reclaimable': self._format_size(sum(c.get('SizeRw', 0) for c in containers_info if c.get('State') != 'running')),
-                    'reclaimable_bytes': sum(c.get('SizeRw', 0) for c in containers_info if c.get('State') != 'running')
+                    'reclaimable': format_size(containers_reclaimable),
+                    'reclaimable_bytes': containers_reclaimable
                 },
                 'images': {
                     'count': len(images_info),
-                    'size': self._format_size(images_size),
+                    'size': format_size(images_size),
                     'size_bytes': images_size,
-                    'shared_size': self._format_size(images_shared_size),
+                    'shared_size': format_size(images_shared_size),
                     'shared_size_bytes': images_shared_size,
-                    'reclaimable': self._format_size(sum(img.get('Size', 0) for img in images_info if not img.get('Containers', 0))),
-                    'reclaimable_bytes': sum(img.get('Size', 0) for img in images_info if not img.get('Containers', 0))
+                    'reclaimable': format_size(images_reclaimable),
+                    'reclaimable_bytes': images_reclaimable
                 },
                 'volumes': {
                     'count': len(volumes_info),
-                    'size': self._format_size(volumes_size),
+                    'size': format_size(volumes_size),
                     'size_bytes': volumes_size,
-                    'reclaimable': self._format_size(sum(vol.get('Size', 0) for vol in volumes_info if vol.get('RefCount', 0) == 0)),
-                    'reclaimable_bytes': sum(vol.get('Size', 0) for vol in volumes_info if vol.get('RefCount', 0) == 0)
+                    'reclaimable': format_size(volumes_reclaimable),
+                    'reclaimable_bytes': volumes_reclaimable
                 },
                 'build_cache': {
                     'count': len(build_cache_info),
-                    'size': self._format_size(build_cache_size),
+                    'size': format_size(build_cache_size),
                     'size_bytes': build_cache_size,
-                    'reclaimable': self._format_size(build_cache_size),
+                    'reclaimable': format_size(build_cache_size),
                     'reclaimable_bytes': build_cache_size
                 },
                 'total': {
-                    'size': self._format_size(containers_size + images_size + volumes_size + build_cache_size),
-                    'size_bytes': containers_size + images_size + volumes_size + build_cache_size
+                    'size': format_size(total_size),
+                    'size_bytes': total_size
                 }
             }
         except Exception as e:
-            logging.error(f"Error getting disk usage: {e}")
-            raise Exception(f"Failed to get disk usage: {str(e)}")
+            raise DockerOpError(f"Failed to get disk usage: {str(e)}") from e
     
+    @cached_method('get_daemon_status')
     def get_daemon_status(self) -> Dict[str, Any]:
         """
         Get Docker daemon status and health information.
@@ -168,16 +230,17 @@ class SystemManager:
             Dict: Daemon status
         """
         try:
-            # Test if daemon is responsive
-            ping_result = self.client.ping()
-            
-            # Get basic info
-            info = self.client.info()
-            version = self.client.version()
+            # Info and version are independent, so issue them together; either
+            # answering already proves the daemon is up, so no separate ping is
+            # needed, and either failing reports the daemon as not running
+            info_future = self._stats_executor.submit(self.client.info)
+            version_future = self._stats_executor.submit(self.client.version)
+            info = info_future.result()
+            version = version_future.result()
             
             return {
                 'status': 'running',
-                'ping': ping_result,
+                'ping': True,
                 'server_version': version.get('Version', 'unknown'),
                 'api_version': version.get('ApiVersion', 'unknown'),
                 'containers_running': info.get('ContainersRunning', 0),
@@ -190,7 +253,7 @@ class SystemManager:
                 'live_restore': info.get('LiveRestoreEnabled', False)
             }
         except Exception as e:
-            logging.error(f"Error getting daemon status: {e}")
+            logger.error("Error getting daemon status: %s", e)
             return {
                 'status': 'not_running',
                 'error': str(e),
@@ -205,9 +268,20 @@ class SystemManager:
             Dict: Overall statistics
         """
         try:
-            info = self.client.info()
-            df_info = self.client.df()
-            
+            # The three daemon calls are independent, so issue them together
+            info_future = self._stats_executor.submit(self.client.info)
+            df_future = self._stats_executor.submit(cached_df, self.client)
+            networks_future = self._stats_executor.submit(self.client.api.networks)
+            info = info_future.result()
+        except Exception as e:
+            raise DockerOpError(f"Failed to get overall statistics: {str(e)}") from e
+        
+        # Disk usage and networks only fill in their own sections, so a
+        # failure there still returns the counts from info
+        df_info = self._optional_result(df_future, 'disk usage')
+        networks = self._optional_result(networks_future, 'networks')
+        
+        try:
             # Calculate totals
             total_containers = info.get('Containers', 0)
             running_containers = info.get('ContainersRunning', 0)
@@ -216,16 +290,22 @@ class SystemManager:
             
             total_images = info.get('Images', 0)
             
-            volumes_info = df_info.get('Volumes', [])
-            total_volumes = len(volumes_info)
-            
-            networks = self.client.networks.list()
-            total_networks = len(networks)
+            total_networks = len(networks) if networks is not None else None
             
             # Calculate disk usage
-            containers_size = sum(c.get('SizeRw', 0) + c.get('SizeRootFs', 0) for c in df_info.get('Containers', []))
-            images_size = sum(img.get('Size', 0) for img in df_info.get('Images', []))
-            volumes_size = sum(vol.get('Size', 0) for vol in volumes_info)
+            if df_info is not None:
+                volumes_info = df_info.get('Volumes', [])
+                total_volumes = len(volumes_info)
+                sizes = {
+                    'containers': sum(c.get('SizeRw', 0) + c.get('SizeRootFs', 0) for c in df_info.get('Containers', [])),
+                    'images': sum(img.get('Size', 0) for img in df_info.get('Images', [])),
+                    'volumes': sum(vol.get('Size', 0) for vol in volumes_info)
+                }
+                disk_usage = {section: format_size(size) for section, size in sizes.items()}
+                disk_usage['total'] = format_size(sum(sizes.values()))
+            else:
+                total_volumes = 0
+                disk_usage = dict.fromkeys(('containers', 'images', 'volumes', 'total'), 'unknown')
             
             return {
                 'containers': {
@@ -233,15 +313,15 @@ class SystemManager:
                     'running': running_containers,
                     'stopped': stopped_containers,
                     'paused': paused_containers,
-                    'disk_usage': self._format_size(containers_size)
+                    'disk_usage': disk_usage['containers']
                 },
                 'images': {
                     'total': total_images,
-                    'disk_usage': self._format_size(images_size)
+                    'disk_usage': disk_usage['images']
                 },
                 'volumes': {
                     'total': total_volumes,
-                    'disk_usage': self._format_size(volumes_size)
+                    'disk_usage': disk_usage['volumes']
                 },
                 'networks': {
                     'total': total_networks
@@ -249,14 +329,30 @@ class SystemManager:
                 'system': {
                     'docker_version': info.get('ServerVersion', 'unknown'),
                     'storage_driver': info.get('Driver', 'unknown'),
-                    'total_disk_usage': self._format_size(containers_size + images_size + volumes_size),
+                    'total_disk_usage': disk_usage['total'],
                     'cpu_count': info.get('NCPU', 0),
-                    'memory_total': self._format_size(info.get('MemTotal', 0))
+                    'memory_total': format_size(info.get('MemTotal', 0))
                 }
             }
         except Exception as e:
-            logging.error(f"Error getting overall statistics: {e}")
-            raise Exception(f"Failed to get overall statistics: {str(e)}")
+            raise DockerOpError(f"Failed to get overall statistics: {str(e)}") from e
+    
+    def _optional_result(self, future, what: str):
+        """
+        Wait for a daemon call whose failure only degrades the response.
+        
+        Args:
+            future (Future): Call submitted to the stats executor
+            what (str): What the call fetches, for the log message
+            
+        Returns:
+            The call's result, or None if it failed
+        """
+        try:
+            return future.result()
+        except Exception as e:
+            logger.warning("Failed to get %s for overall statistics: %s", what, e)
+            return None
     
     def get_host_system_info(self) -> Dict[str, Any]:
         """
@@ -266,44 +362,37 @@ class SystemManager:
             Dict: Host system information
         """
         try:
+            # One snapshot each, so the fields are consistent with one another
+            memory = psutil.virtual_memory()
+            disk = psutil.disk_usage('/')
             return {
-                'platform': platform.platform(),
-                'system': platform.system(),
-                'release': platform.release(),
-                'version': platform.version(),
-                'machine': platform.machine(),
-                'processor': platform.processor(),
-                'python_version': platform.python_version(),
-                'cpu_count': psutil.cpu_count(),
-                'cpu_percent': psutil.cpu_percent(interval=1),
+                **_STATIC_HOST,
+                'cpu_percent': self._cpu_percent,
                 'memory': {
-                    'total': self._format_size(psutil.virtual_memory().total),
-                    'available': self._format_size(psutil.virtual_memory().available),
-                    'percent': psutil.virtual_memory().percent,
-                    'used': self._format_size(psutil.virtual_memory().used),
-                    'free': self._format_size(psutil.virtual_memory().free)
+                    'total': format_size(memory.total),
+                    'available': format_size(memory.available),
+                    'percent': memory.percent,
+                    'used': format_size(memory.used),
+                    'free': format_size(memory.free)
                 },
                 'disk': {
-                    'total': self._format_size(psutil.disk_usage('/').total),
-                    'used': self._format_size(psutil.disk_usage('/').used),
-                    'free': self._format_size(psutil.disk_usage('/').free),
-                    'percent': psutil.disk_usage('/').percent
+                    'total': format_size(disk.total),
+                    'used': format_size(disk.used),
+                    'free': format_size(disk.free),
+                    'percent': disk.percent
                 }
             }
         except Exception as e:
-            logging.error(f"Error getting host system info: {e}")
-            raise Exception(f"Failed to get host system info: {str(e)}")
+            raise DockerOpError(f"Failed to get host system info: {str(e)}") from e
     
-    def _format_size(self, size_bytes: int) -> str:
-        """Format size in bytes to human readable format."""
-        if size_bytes == 0:
-            return "0 B"
-        
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.1f} PB"
+    def _sample_cpu(self):
+        """Measure host CPU usage over each CPU_SAMPLE_INTERVAL, for as long as the process runs."""
+        while True:
+            try:
+                self._cpu_percent = psutil.cpu_percent(interval=CPU_SAMPLE_INTERVAL)
+            except Exception as e:
+                logger.error("Error sampling host CPU usage: %s", e)
+                time.sleep(CPU_SAMPLE_INTERVAL)
     
     def _format_swarm_info(self, swarm_info: Dict[str, Any]) -> Dict[str, Any]:
         """Format Swarm information."""
@@ -1,6 +1,15 @@
 import docker
-from typing import Dict, List, Any, Optional
-import logging
+from typing import Dict, Iterator, List, Any, Optional
+import re
+
+from src.cache import cached_df, invalidate_df
+from src.docker_client import get_client
+from src.errors import DockerOpError
+from src.formatting import format_size
+
+# Docker error messages that map to friendlier errors
+_ALREADY_EXISTS = re.compile(r'already exists', re.IGNORECASE)
+_VOLUME_IN_USE = re.compile(r'volume is in use', re.IGNORECASE)
 
 class VolumeManager:
     """
@@ -8,15 +17,14 @@ class VolumeManager:
     and getting volume details and usage information.
     """
     
-    def __init__(self):
-        """Initialize Docker client connection."""
-        try:
-            self.client = docker.from_env()
-            # Test connection
-            self.client.ping()
-        except Exception as e:
-            logging.error(f"Failed to connect to Docker daemon: {e}")
-            raise ConnectionError("Cannot connect to Docker daemon. Make sure Docker is running.")
+    def __init__(self, client: Optional[docker.DockerClient] = None):
+        """
+        Initialize the manager.
+        
+        Args:
+            client (docker.DockerClient, optional): Docker client to use (defaults to the shared client)
+        """
+        self.client = client or get_client()
     
     def list_volumes(self) -> List[Dict[str, Any]]:
         """
@@ -25,27 +33,33 @@ class VolumeManager:
         Returns:
             List[Dict]: List of volume information dictionaries
         """
+        return list(self.iter_volumes())
+    
+    def iter_volumes(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield volume information one volume at a time, for streaming responses.
+        
+        Returns:
+            Iterator[Dict]: Volume information dictionaries
+        """
         try:
-            volumes = self.client.volumes.list()
-            volume_list = []
-            
+            # Raw /volumes entries, without building a Volume model for each
+            volumes = self.client.api.volumes().get('Volumes') or []
+            # One df for the whole listing, looked up by volume name
+            usage_by_name = self._get_volume_usage_index()
             for volume in volumes:
-                volume_info = {
-                    'name': volume.name,
-                    'driver': volume.attrs.get('Driver', 'local'),
-                    'mountpoint': volume.attrs.get('Mountpoint', ''),
-                    'created': volume.attrs.get('CreatedAt', ''),
-                    'scope': volume.attrs.get('Scope', 'local'),
-                    'labels': volume.attrs.get('Labels') or {},
-                    'options': volume.attrs.get('Options') or {},
-                    'usage': self._get_volume_usage(volume.name)
+                yield {
+                    'name': volume['Name'],
+                    'driver': volume.get('Driver', 'local'),
+                    'mountpoint': volume.get('Mountpoint', ''),
+                    'created': volume.get('CreatedAt', ''),
+                    'scope': volume.get('Scope', 'local'),
+                    'labels': volume.get('Labels') or {},
+                    'options': volume.get('Options') or {},
+                    'usage': self._format_volume_usage(usage_by_name.get(volume['Name']))
                 }
-                volume_list.append(volume_info)
-            
-            return volume_list
         except Exception as e:
-            logging.error(f"Error listing volumes: {e}")
-            raise Exception(f"Failed to list volumes: {str(e)}")
+            raise DockerOpError(f"Failed to list volumes: {str(e)}") from e
     
     def get_volume_details(self, volume_name: str) -> Dict[str, Any]:
         """
@@ -58,26 +72,25 @@ class VolumeManager:
             Dict: Detailed volume information
         """
         try:
-            volume = self.client.volumes.get(volume_name)
+            volume = self.client.api.inspect_volume(volume_name)
             
             details = {
-                'name': volume.name,
-                'driver': volume.attrs.get('Driver', 'local'),
-                'mountpoint': volume.attrs.get('Mountpoint', ''),
-                'created': volume.attrs.get('CreatedAt', ''),
-                'scope': volume.attrs.get('Scope', 'local'),
-                'labels': volume.attrs.get('Labels') or {},
-                'options': volume.attrs.get('Options') or {},
+                'name': volume['Name'],
+                'driver': volume.get('Driver', 'local'),
+                'mountpoint': volume.get('Mountpoint', ''),
+                'created': volume.get('CreatedAt', ''),
+                'scope': volume.get('Scope', 'local'),
+                'labels': volume.get('Labels') or {},
+                'options': volume.get('Options') or {},
                 'usage': self._get_volume_usage(volume_name),
                 'containers_using': self._get_containers_using_volume(volume_name)
             }
             
             return details
         except docker.errors.NotFound:
-            raise Exception(f"Volume '{volume_name}' not found")
+            raise DockerOpError(f"Volume '{volume_name}' not found")
         except Exception as e:
-            logging.error(f"Error getting volume details: {e}")
-            raise Exception(f"Failed to get volume details: {str(e)}")
+            raise DockerOpError(f"Failed to get volume details: {str(e)}") from e
     
     def create_volume(self, name: Optional[str] = None, driver: str = 'local', 
                      labels: Optional[Dict[str, str]] = None, 
@@ -101,6 +114,7 @@ class VolumeManager:
                 labels=labels or {},
                 driver_opts=options or {}
             )
+            invalidate_df()
             
             return {
                 'message': f"Volume '{volume.name}' created successfully",
@@ -113,12 +127,11 @@ class VolumeManager:
                 'status': 'created'
             }
         except docker.errors.APIError as e:
-            if 'already exists' in str(e).lower():
-                raise Exception(f"Volume '{name}' already exists")
-            raise Exception(f"Failed to create volume: {str(e)}")
+            if _ALREADY_EXISTS.search(str(e)):
+                raise DockerOpError(f"Volume '{name}' already exists") from e
+            raise DockerOpError(f"Failed to create volume: {str(e)}") from e
         except Exception as e:
-            logging.error(f"Error creating volume: {e}")
-            raise Exception(f"Failed to create volume: {str(e)}")
+            raise DockerOpError(f"Failed to create volume: {str(e)}") from e
     
     def remove_volume(self, volume_name: str, force: bool = False) -> Dict[str, str]:
         """
@@ -132,8 +145,9 @@ class VolumeManager:
             Dict: Removal operation result
         """
         try:
-            volume = self.client.volumes.get(volume_name)
-            volume.remove(force=force)
+            # Remove by name directly, without inspecting the volume first
+            self.client.api.remove_volume(volume_name, force=force)
+            invalidate_df()
             
             return {
                 'message': f"Volume '{volume_name}' removed successfully",
@@ -141,16 +155,15 @@ class VolumeManager:
                 'status': 'removed'
             }
         except docker.errors.NotFound:
-            raise Exception(f"Volume '{volume_name}' not found")
+            raise DockerOpError(f"Volume '{volume_name}' not found")
         except docker.errors.APIError as e:
-            if 'volume is in use' in str(e).lower():
+            if _VOLUME_IN_USE.search(str(e)):
                 containers = self._get_containers_using_volume(volume_name)
                 container_names = [c['name'] for c in containers]
-                raise Exception(f"Cannot remove volume '{volume_name}' - it's being used by containers: {', '.join(container_names)}. Stop containers first or use force=True")
-            raise Exception(f"Failed to remove volume: {str(e)}")
+                raise DockerOpError(f"Cannot remove volume '{volume_name}' - it's being used by containers: {', '.join(container_names)}. Stop containers first or use force=True") from e
+            raise DockerOpError(f"Failed to remove volume: {str(e)}") from e
         except Exception as e:
-            logging.error(f"Error removing volume: {e}")
-            raise Exception(f"Failed to remove volume: {str(e)}")
+            raise DockerOpError(f"Failed to remove volume: {str(e)}") from e
     
     def prune_volumes(self) -> Dict[str, Any]:
         """
@@ -161,16 +174,16 @@ class VolumeManager:
         """
         try:
             result = self.client.volumes.prune()
+            invalidate_df()
             
             return {
                 'message': 'Volume pruning completed',
                 'volumes_deleted': result.get('VolumesDeleted', []),
-                'space_reclaimed': self._format_size(result.get('SpaceReclaimed', 0)),
+                'space_reclaimed': format_size(result.get('SpaceReclaimed', 0)),
                 'space_reclaimed_bytes': result.get('SpaceReclaimed', 0)
             }
         except Exception as e:
-            logging.error(f"Error pruning volumes: {e}")
-            raise Exception(f"Failed to prune volumes: {str(e)}")
+            raise DockerOpError(f"Failed to prune volumes: {str(e)}") from e
     
     def inspect_volume(self, volume_name: str) -> Dict[str, Any]:
         """
@@ -184,40 +197,63 @@ class VolumeManager:
         """
         return self.get_volume_details(volume_name)
     
-    def _get_volume_usage(self, volume_name: str) -> Dict[str, Any]:
+    def _get_volume_usage(self, volume_name: str, df_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Get volume usage information.
         
         Args:
             volume_name (str): Volume name
+            df_info (Dict, optional): Already fetched system df data to look the volume up in
             
         Returns:
             Dict: Usage information
         """
         try:
             # Try to get volume usage from system df
-            df_info = self.client.df()
-            volumes_info = df_info.get('Volumes', [])
+            if df_info is None:
+                df_info = cached_df(self.client)
             
-            for vol_info in volumes_info:
+            for vol_info in df_info.get('Volumes') or []:
                 if vol_info.get('Name') == volume_name:
-                    return {
-                        'size': self._format_size(vol_info.get('Size', 0)),
-                        'size_bytes': vol_info.get('Size', 0),
-                        'ref_count': vol_info.get('RefCount', 0)
-                    }
-            
-            return {
-                'size': 'Unknown',
-                'size_bytes': 0,
-                'ref_count': 0
-            }
+                    return self._format_volume_usage(vol_info)
+        except Exception:
+            pass
+        return self._format_volume_usage(None)
+    
+    def _get_volume_usage_index(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the system df entry of every volume, keyed by volume name.
+        
+        Returns:
+            Dict: Volume df entries by name, empty if disk usage is unavailable
+        """
+        try:
+            df_info = cached_df(self.client)
         except Exception:
+            return {}
+        return {vol_info.get('Name'): vol_info for vol_info in df_info.get('Volumes') or []}
+    
+    def _format_volume_usage(self, vol_info: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Build the usage information of a volume from its system df entry.
+        
+        Args:
+            vol_info (Dict, optional): Volume entry from system df, None if the volume is not listed
+            
+        Returns:
+            Dict: Usage information
+        """
+        if vol_info is None:
             return {
                 'size': 'Unknown',
                 'size_bytes': 0,
                 'ref_count': 0
             }
+        return {
+            'size': format_size(vol_info.get('Size', 0)),
+            'size_bytes': vol_info.get('Size', 0),
+            'ref_count': vol_info.get('RefCount', 0)
+        }
     
     def _get_containers_using_volume(self, volume_name: str) -> List[Dict[str, str]]:
         """
@@ -230,17 +266,19 @@ class VolumeManager:
             List[Dict]: List of containers using the volume
         """
         try:
-            containers = self.client.containers.list(all=True)
+            # The daemon filters by volume, and the /containers/json summaries
+            # already include mounts, so no container needs to be inspected
+            containers = self.client.api.containers(all=True, filters={'volume': volume_name})
             using_containers = []
             
             for container in containers:
-                mounts = container.attrs.get('Mounts', [])
+                mounts = container.get('Mounts') or []
                 for mount in mounts:
                     if mount.get('Type') == 'volume' and mount.get('Name') == volume_name:
                         using_containers.append({
-                            'id': container.id[:12],
-                            'name': container.name,
-                            'status': container.status,
+                            'id': container['Id'][:12],
+                            'name': (container.get('Names') or ['/'])[0].lstrip('/'),
+                            'status': container.get('State', 'unknown'),
                             'mount_destination': mount.get('Destination', '')
                         })
                         break
@@ -249,17 +287,6 @@ class VolumeManager:
         except Exception:
             return []
     
-    def _format_size(self, size_bytes: int) -> str:
-        """Format size in bytes to human readable format."""
-        if size_bytes == 0:
-            return "0 B"
-        
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.1f} PB"
-    
     def get_volume_stats(self) -> Dict[str, Any]:
         """
         Get overall volume statistics.
@@ -268,27 +295,31 @@ class VolumeManager:
             Dict: Volume statistics
         """
         try:
-            volumes = self.client.volumes.list()
-            df_info = self.client.df()
-            volumes_df = df_info.get('Volumes', [])
+            volumes = self.client.api.volumes().get('Volumes') or []
+            df_info = cached_df(self.client)
+            volumes_df = df_info.get('Volumes') or []
             
-            total_size = sum(vol.get('Size', 0) for vol in volumes_df)
+            # Size and unused count from the df entries already fetched, in one pass
+            total_size = unused_volumes = 0
+            for vol in volumes_df:
+                total_size += vol.get('Size', 0)
+                if vol.get('RefCount', 0) == 0:
+                    unused_volumes += 1
             total_count = len(volumes)
             
             # Count volumes by driver
             drivers = {}
             for volume in volumes:
-                driver = volume.attrs.get('Driver', 'local')
+                driver = volume.get('Driver', 'local')
                 drivers[driver] = drivers.get(driver, 0) + 1
             
             return {
                 'total_volumes': total_count,
-                'total_size': self._format_size(total_size),
+                'total_size': format_size(total_size),
                 'total_size_bytes': total_size,
                 'drivers': drivers,
-                'unused_volumes': len([vol for vol in volumes_df if vol.get('RefCount', 0) == 0])
+                'unused_volumes': unused_volumes
             }
         except Exception as e:
-            logging.error(f"Error getting volume stats: {e}")
-            raise Exception(f"Failed to get volume statistics: {str(e)}")
+            raise DockerOpError(f"Failed to get volume statistics: {str(e)}") from e
 
@@ -0,0 +1,7 @@
+# Patch the standard library before anything else is imported, so the
+# sockets used by docker-py (via requests) yield to other requests while
+# waiting on the Docker daemon
+from gevent import monkey
+monkey.patch_all()
+
+from src.main import app  # noqa: E402
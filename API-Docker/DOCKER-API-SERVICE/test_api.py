@@ -4,77 +4,188 @@ Test script for Docker Management API
 This script demonstrates how to use the API endpoints.
 """
 
+import argparse
+import atexit
+from concurrent.futures import ThreadPoolExecutor
 import requests
-import json
-import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 import sys
+from urllib.parse import urlparse
+
+# Endpoints exercised by the tests
+SYSTEM_ENDPOINTS = ('/api/system/version', '/api/system/info', '/api/system/status')
+ENDPOINTS = ('/health', '/api/commands', '/api/containers') + SYSTEM_ENDPOINTS
+
+# What a check can fail with: the request itself (connection, timeout,
+# exhausted retries) or a body that is not JSON
+REQUEST_ERRORS = (requests.RequestException, orjson.JSONDecodeError)
+
+# Endpoints whose responses do not change during a run
+CACHEABLE_PATHS = frozenset({'/api/commands', '/api/system/version', '/api/system/info'})
 
 class DockerAPITester:
-    def __init__(self, base_url="http://localhost:5000"):
+    __slots__ = ('base_url', 'verbose', '_urls', 'enable_cache', '_cache', 'session')
+    
+    # Sessions by base URL, shared by every tester of the same API so
+    # their keep-alive connections outlive a single tester
+    _sessions = {}
+    
+    def __init__(self, base_url="http://localhost:5000", enable_cache=True, verbose=True):
         self.base_url = base_url
+        # Print full response bodies; when off, the health check only asks for the status
+        self.verbose = verbose
+        # Full URLs of the tested endpoints, built once
+        self._urls = {path: f"{base_url}{path}" for path in ENDPOINTS}
+        # Responses of CACHEABLE_PATHS by URL; those with an ETag are
+        # revalidated (a bodyless 304 when unchanged), others reused as is
+        self.enable_cache = enable_cache
+        self._cache = {}
+        # One session for every request, so they share a keep-alive connection
+        self.session = self._sessions.get(base_url)
+        if self.session is None:
+            self.session = self._sessions[base_url] = self._build_session()
+    
+    @staticmethod
+    def _build_session():
+        """Create a session with JSON defaults and a sized, retrying connection pool."""
+        session = requests.Session()
+        session.headers['Accept'] = 'application/json'
+        # Explicit pool sizing, and a couple of quick retries on gateway
+        # errors; 503 is not retried since /health uses it to report an
+        # unreachable Docker daemon
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=2, backoff_factor=0.1, status_forcelist=[502, 504], raise_on_status=False)
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
+    @classmethod
+    def close_sessions(cls):
+        """Close every shared session (registered to run at exit)."""
+        for session in cls._sessions.values():
+            session.close()
+        cls._sessions.clear()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        """Drop the session's pooled connections; the shared session reconnects if used again."""
+        self.session.close()
+    
+    def get(self, path):
+        """GET an API path, answering unchanging endpoints from the cache when enabled."""
+        url = self._urls.get(path) or f"{self.base_url}{path}"
+        cacheable = self.enable_cache and path in CACHEABLE_PATHS
+        cached = self._cache.get(url) if cacheable else None
+        headers = None
+        if cached is not None:
+            etag = cached.headers.get('ETag')
+            if etag is None:
+                return cached
+            headers = {'If-None-Match': etag}
+        response = self.session.get(url, headers=headers, timeout=5)
+        if cached is not None and response.status_code == 304:
+            return cached
+        if cacheable and response.status_code == 200:
+            self._cache[url] = response
+        return response
+    
+    def _emit(self, lines):
+        """Write a check's output lines in one go, so concurrent checks never interleave."""
+        sys.stdout.write("\n".join(lines) + "\n")
         
     def test_health(self):
         """Test the health endpoint."""
-        print("Testing health endpoint...")
+        lines = ["Testing health endpoint..."]
         try:
-            response = requests.get(f"{self.base_url}/health", timeout=5)
-            print(f"Status Code: {response.status_code}")
-            print(f"Response: {json.dumps(response.json(), indent=2)}")
+            if self.verbose:
+                response = self.get("/health")
+            else:
+                # HEAD runs the same check but sends no body back
+                response = self.session.head(self._urls["/health"], timeout=5)
+            lines.append(f"Status Code: {response.status_code}")
+            if self.verbose:
+                lines.append(f"Response: {orjson.dumps(orjson.loads(response.content), option=orjson.OPT_INDENT_2).decode()}")
             return response.status_code == 200 or response.status_code == 503
-        except Exception as e:
-            print(f"Error: {e}")
+        except REQUEST_ERRORS as e:
+            lines.append(f"Error: {e}")
             return False
+        finally:
+            self._emit(lines)
     
     def test_commands_endpoint(self):
         """Test the commands documentation endpoint."""
-        print("\nTesting commands endpoint...")
+        lines = ["\nTesting commands endpoint..."]
         try:
-            response = requests.get(f"{self.base_url}/api/commands", timeout=5)
-            print(f"Status Code: {response.status_code}")
-            data = response.json()
-            print("Available command categories:")
+            response = self.get("/api/commands")
+            lines.append(f"Status Code: {response.status_code}")
+            data = orjson.loads(response.content)
+            lines.append("Available command categories:")
             for category in data.get('commands', {}):
-                print(f"  - {category}")
+                lines.append(f"  - {category}")
             return response.status_code == 200
-        except Exception as e:
-            print(f"Error: {e}")
+        except REQUEST_ERRORS as e:
+            lines.append(f"Error: {e}")
             return False
+        finally:
+            self._emit(lines)
     
     def test_containers_endpoint(self):
         """Test the containers endpoint."""
-        print("\nTesting containers endpoint...")
+        lines = ["\nTesting containers endpoint..."]
         try:
-            response = requests.get(f"{self.base_url}/api/containers", timeout=5)
-            print(f"Status Code: {response.status_code}")
-            data = response.json()
+            response = self.get("/api/containers")
+            lines.append(f"Status Code: {response.status_code}")
+            data = orjson.loads(response.content)
             if data.get('success'):
-                print(f"Found {data.get('count', 0)} containers")
+                lines.append(f"Found {data.get('count', 0)} containers")
             else:
-                print(f"Error: {data.get('error', 'Unknown error')}")
+                lines.append(f"Error: {data.get('error', 'Unknown error')}")
             return True  # Even errors are expected without Docker
-        except Exception as e:
-            print(f"Error: {e}")
+        except REQUEST_ERRORS as e:
+            lines.append(f"Error: {e}")
             return False
+        finally:
+            self._emit(lines)
     
     def test_system_endpoints(self):
         """Test system information endpoints."""
-        print("\nTesting system endpoints...")
-        endpoints = [
-            "/api/system/version",
-            "/api/system/info",
-            "/api/system/status"
-        ]
+        lines = ["\nTesting system endpoints..."]
+        endpoints = SYSTEM_ENDPOINTS
         
-        for endpoint in endpoints:
+        def fetch(endpoint):
             try:
-                response = requests.get(f"{self.base_url}{endpoint}", timeout=5)
-                print(f"{endpoint}: Status {response.status_code}")
+                response = self.get(endpoint)
+                message = None
                 if response.status_code == 500:
-                    data = response.json()
-                    print(f"  Expected error: {data.get('error', 'Unknown')}")
-            except Exception as e:
-                print(f"  Error: {e}")
+                    message = orjson.loads(response.content).get('error', 'Unknown')
+                return response.status_code, message, None
+            except REQUEST_ERRORS as e:
+                return None, None, e
+        
+        # The endpoints are independent, so request them all at once and
+        # report the results in order
+        with ThreadPoolExecutor(max_workers=len(endpoints)) as executor:
+            results = list(executor.map(fetch, endpoints))
         
+        for endpoint, (status_code, message, error) in zip(endpoints, results):
+            if error is not None:
+                lines.append(f"  Error: {error}")
+                continue
+            lines.append(f"{endpoint}: Status {status_code}")
+            if message is not None:
+                lines.append(f"  Expected error: {message}")
+        
+        self._emit(lines)
         return True
     
     def run_all_tests(self):
@@ -89,28 +200,42 @@ class DockerAPITester:
             self.test_system_endpoints
         ]
         
-        passed = 0
-        for test in tests:
-            if test():
-                passed += 1
+        passed = sum(test() for test in tests)
         
         print(f"\nTest Results: {passed}/{len(tests)} tests passed")
         print("\nNote: Some endpoints may return errors without Docker daemon running.")
         print("This is expected behavior and demonstrates proper error handling.")
 
+atexit.register(DockerAPITester.close_sessions)
+
+def parse_args(argv=None):
+    """Parse the command line, checking the API URL once up front."""
+    parser = argparse.ArgumentParser(description="Test the Docker Management API endpoints.")
+    parser.add_argument('base_url', nargs='?', default="http://localhost:5000",
+                        help="API base URL (default: http://localhost:5000)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Request every endpoint fresh instead of reusing unchanged responses")
+    parser.add_argument('--quiet', action='store_true',
+                        help="Do not print response bodies (the health check then uses HEAD)")
+    args = parser.parse_args(argv)
+    
+    parsed = urlparse(args.base_url)
+    if parsed.scheme not in ('http', 'https') or not parsed.netloc:
+        parser.error(f"invalid API URL '{args.base_url}', expected e.g. http://localhost:5000")
+    # Endpoint paths are appended to it, so drop any trailing slash
+    args.base_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path.rstrip('/')}"
+    return args
+
 def main():
     """Main function."""
-    if len(sys.argv) > 1:
-        base_url = sys.argv[1]
-    else:
-        base_url = "http://localhost:5000"
+    args = parse_args()
     
-    print(f"Testing API at: {base_url}")
+    print(f"Testing API at: {args.base_url}")
     print("Make sure the API server is running with: python src/main.py")
     print()
     
-    tester = DockerAPITester(base_url)
-    tester.run_all_tests()
+    with DockerAPITester(args.base_url, enable_cache=not args.no_cache, verbose=not args.quiet) as tester:
+        tester.run_all_tests()
 
 if __name__ == "__main__":
     main()